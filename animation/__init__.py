@@ -1,3 +1,17 @@
-from .animation import Animation, Task, remove_animations_of
+from .animation import Animation, Task, TaskSequence, ViewportCulling, \
+    remove_animations_of
+from .bake import BakeCache
+from .budget import CallbackBudget
+from .clips import ClipLibrary, ClipPlayer, write_clips
+from .clock import VirtualClock
+from .columns import ColumnAnimation
+from .fixed import FixedAnimation
+from .group import AnimationGroup
+from .instanced import InstancedAnimation
+from .properties import AnimatedProperty, LazyAnimation
+from .springs import Spring, Springs
+from .trace import TraceRecorder
+from .tracks import StreamTrack
+from .transitions import AnimationTransition, register_transition
 
 __version__ = '0.0.5'
@@ -0,0 +1,656 @@
+/*
+ * Optional compiled versions of the inner loops of Animation.update and
+ * FixedAnimation.update, and the AnimationTransition curves.
+ *
+ * Task.update is not here: its accumulate-and-compare is only a few
+ * bytecodes, and calling into C and returning a tuple was measured to
+ * be slower than the pure Python version.
+ *
+ * The pure Python versions in animation.py and transitions.py are the
+ * reference; every function here must give the same results.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <math.h>
+
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+
+
+/* Set a value object like Animation._set_value; steals py_value */
+static int
+set_object(PyObject *target, PyObject *name, PyObject *py_value)
+{
+    PyObject *attr, *result;
+    int status = 0;
+
+    if (py_value == NULL)
+        return -1;
+
+    attr = PyObject_GetAttr(target, name);
+    if (attr == NULL) {
+        Py_DECREF(py_value);
+        return -1;
+    }
+
+    if (PyCallable_Check(attr)) {
+        result = PyObject_CallFunctionObjArgs(attr, py_value, NULL);
+        if (result == NULL)
+            status = -1;
+        Py_XDECREF(result);
+    }
+    else {
+        status = PyObject_SetAttr(target, name, py_value);
+    }
+
+    Py_DECREF(attr);
+    Py_DECREF(py_value);
+    return status;
+}
+
+
+/* Set a value like Animation._set_value */
+static int
+set_value(PyObject *target, PyObject *name, double value, int round_values)
+{
+    if (round_values)
+        return set_object(target, name, PyLong_FromDouble(nearbyint(value)));
+    return set_object(target, name, PyFloat_FromDouble(value));
+}
+
+
+PyDoc_STRVAR(animation_step_doc,
+"animation_step(targets, elapsed, duration, transition, round_values)\n\
+\n\
+Compute the progress, apply the transition, and set the interpolated\n\
+value of every property of every target.  Returns the progress.");
+
+static PyObject *
+animation_step(PyObject *self, PyObject *const *args, Py_ssize_t nargs)
+{
+    PyObject *targets, *transition, *py_p, *py_t, *item, *target, *props;
+    PyObject *name, *values;
+    double elapsed, duration, p, t, s, a, b;
+    int round_values;
+    Py_ssize_t i, n, pos;
+
+    /* fast call, so no tuple is made for the arguments each update */
+    if (nargs != 5) {
+        PyErr_SetString(PyExc_TypeError, "animation_step takes 5 arguments");
+        return NULL;
+    }
+    targets = args[0];
+    if (!PyList_Check(targets)) {
+        PyErr_SetString(PyExc_TypeError, "targets must be a list");
+        return NULL;
+    }
+    elapsed = PyFloat_AsDouble(args[1]);
+    if (elapsed == -1. && PyErr_Occurred())
+        return NULL;
+    duration = PyFloat_AsDouble(args[2]);
+    if (duration == -1. && PyErr_Occurred())
+        return NULL;
+    transition = args[3];
+    round_values = PyObject_IsTrue(args[4]);
+    if (round_values < 0)
+        return NULL;
+
+    if (duration == 0.) {
+        PyErr_SetString(PyExc_ZeroDivisionError, "float division by zero");
+        return NULL;
+    }
+    p = elapsed / duration;
+    if (p > 1.)
+        p = 1.;
+
+    py_p = PyFloat_FromDouble(p);
+    if (py_p == NULL)
+        return NULL;
+    py_t = PyObject_CallFunctionObjArgs(transition, py_p, NULL);
+    if (py_t == NULL) {
+        Py_DECREF(py_p);
+        return NULL;
+    }
+    t = PyFloat_AsDouble(py_t);
+    Py_DECREF(py_t);
+    if (t == -1. && PyErr_Occurred()) {
+        Py_DECREF(py_p);
+        return NULL;
+    }
+    s = 1. - t;
+
+    n = PyList_GET_SIZE(targets);
+    for (i = 0; i < n; i++) {
+        item = PyList_GET_ITEM(targets, i);
+        if (!PyTuple_Check(item) || PyTuple_GET_SIZE(item) != 2) {
+            PyErr_SetString(PyExc_TypeError, "targets must be 2-tuples");
+            goto error;
+        }
+        target = PyTuple_GET_ITEM(item, 0);
+        props = PyTuple_GET_ITEM(item, 1);
+        if (!PyDict_Check(props)) {
+            PyErr_SetString(PyExc_TypeError, "props must be a dict");
+            goto error;
+        }
+
+        pos = 0;
+        while (PyDict_Next(props, &pos, &name, &values)) {
+            if (!PyTuple_Check(values) || PyTuple_GET_SIZE(values) != 2) {
+                PyErr_SetString(PyExc_TypeError, "values must be 2-tuples");
+                goto error;
+            }
+            a = PyFloat_AsDouble(PyTuple_GET_ITEM(values, 0));
+            if (a == -1. && PyErr_Occurred())
+                goto error;
+            b = PyFloat_AsDouble(PyTuple_GET_ITEM(values, 1));
+            if (b == -1. && PyErr_Occurred())
+                goto error;
+
+            Py_INCREF(name);
+            if (set_value(target, name, (a * s) + (b * t),
+                          round_values) < 0) {
+                Py_DECREF(name);
+                goto error;
+            }
+            Py_DECREF(name);
+        }
+    }
+
+    return py_p;
+
+error:
+    Py_DECREF(py_p);
+    return NULL;
+}
+
+
+/* Transitions; these must match AnimationTransition */
+
+static double linear(double p) { return p; }
+static double in_quad(double p) { return p * p; }
+static double out_quad(double p) { return -1.0 * p * (p - 2.0); }
+
+static double in_out_quad(double progress)
+{
+    double p = progress * 2;
+    if (p < 1)
+        return 0.5 * p * p;
+    p -= 1.0;
+    return -0.5 * (p * (p - 2.0) - 1.0);
+}
+
+static double in_cubic(double p) { return p * p * p; }
+
+static double out_cubic(double progress)
+{
+    double p = progress - 1.0;
+    return p * p * p + 1.0;
+}
+
+static double in_out_cubic(double progress)
+{
+    double p = progress * 2;
+    if (p < 1)
+        return 0.5 * p * p * p;
+    p -= 2;
+    return 0.5 * (p * p * p + 2.0);
+}
+
+static double in_quart(double p) { return p * p * p * p; }
+
+static double out_quart(double progress)
+{
+    double p = progress - 1.0;
+    return -1.0 * (p * p * p * p - 1.0);
+}
+
+static double in_out_quart(double progress)
+{
+    double p = progress * 2;
+    if (p < 1)
+        return 0.5 * p * p * p * p;
+    p -= 2;
+    return -0.5 * (p * p * p * p - 2.0);
+}
+
+static double in_quint(double p) { return p * p * p * p * p; }
+
+static double out_quint(double progress)
+{
+    double p = progress - 1.0;
+    return p * p * p * p * p + 1.0;
+}
+
+static double in_out_quint(double progress)
+{
+    double p = progress * 2;
+    if (p < 1)
+        return 0.5 * p * p * p * p * p;
+    p -= 2.0;
+    return 0.5 * (p * p * p * p * p + 2.0);
+}
+
+static double in_sine(double p) { return -1.0 * cos(p * (M_PI / 2.0)) + 1.0; }
+static double out_sine(double p) { return sin(p * (M_PI / 2.0)); }
+static double in_out_sine(double p) { return -0.5 * (cos(M_PI * p) - 1.0); }
+
+static double in_expo(double p)
+{
+    if (p == 0)
+        return 0.0;
+    return pow(2, 10 * (p - 1.0));
+}
+
+static double out_expo(double p)
+{
+    if (p == 1.0)
+        return 1.0;
+    return -pow(2, -10 * p) + 1.0;
+}
+
+static double in_out_expo(double progress)
+{
+    double p;
+    if (progress == 0)
+        return 0.0;
+    if (progress == 1.)
+        return 1.0;
+    p = progress * 2;
+    if (p < 1)
+        return 0.5 * pow(2, 10 * (p - 1.0));
+    p -= 1.0;
+    return 0.5 * (-pow(2, -10 * p) + 2.0);
+}
+
+static double in_circ(double p) { return -1.0 * (sqrt(1.0 - p * p) - 1.0); }
+
+static double out_circ(double progress)
+{
+    double p = progress - 1.0;
+    return sqrt(1.0 - p * p);
+}
+
+static double in_out_circ(double progress)
+{
+    double p = progress * 2;
+    if (p < 1)
+        return -0.5 * (sqrt(1.0 - p * p) - 1.0);
+    p -= 2.0;
+    return 0.5 * (sqrt(1.0 - p * p) + 1.0);
+}
+
+static double in_elastic(double progress)
+{
+    double p = .3;
+    double s = p / 4.0;
+    double q = progress;
+    if (q == 1)
+        return 1.0;
+    q -= 1.0;
+    return -(pow(2, 10 * q) * sin((q - s) * (2 * M_PI) / p));
+}
+
+static double out_elastic(double progress)
+{
+    double p = .3;
+    double s = p / 4.0;
+    double q = progress;
+    if (q == 1)
+        return 1.0;
+    return pow(2, -10 * q) * sin((q - s) * (2 * M_PI) / p) + 1.0;
+}
+
+static double in_out_elastic(double progress)
+{
+    double p = .3 * 1.5;
+    double s = p / 4.0;
+    double q = progress * 2;
+    if (q == 2)
+        return 1.0;
+    if (q < 1) {
+        q -= 1.0;
+        return -.5 * (pow(2, 10 * q) * sin((q - s) * (2.0 * M_PI) / p));
+    }
+    q -= 1.0;
+    return pow(2, -10 * q) * sin((q - s) * (2.0 * M_PI) / p) * .5 + 1.0;
+}
+
+static double in_back(double p)
+{
+    return p * p * ((1.70158 + 1.0) * p - 1.70158);
+}
+
+static double out_back(double progress)
+{
+    double p = progress - 1.0;
+    return p * p * ((1.70158 + 1) * p + 1.70158) + 1.0;
+}
+
+static double in_out_back(double progress)
+{
+    double p = progress * 2.;
+    double s = 1.70158 * 1.525;
+    if (p < 1)
+        return 0.5 * (p * p * ((s + 1.0) * p - s));
+    p -= 2.0;
+    return 0.5 * (p * p * ((s + 1.0) * p + s) + 2.0);
+}
+
+static double out_bounce_internal(double t, double d)
+{
+    double p = t / d;
+    if (p < (1.0 / 2.75))
+        return 7.5625 * p * p;
+    else if (p < (2.0 / 2.75)) {
+        p -= (1.5 / 2.75);
+        return 7.5625 * p * p + .75;
+    }
+    else if (p < (2.5 / 2.75)) {
+        p -= (2.25 / 2.75);
+        return 7.5625 * p * p + .9375;
+    }
+    p -= (2.625 / 2.75);
+    return 7.5625 * p * p + .984375;
+}
+
+static double in_bounce_internal(double t, double d)
+{
+    return 1.0 - out_bounce_internal(d - t, d);
+}
+
+static double in_bounce(double p) { return in_bounce_internal(p, 1.); }
+static double out_bounce(double p) { return out_bounce_internal(p, 1.); }
+
+static double in_out_bounce(double progress)
+{
+    double p = progress * 2.;
+    if (p < 1.)
+        return in_bounce_internal(p, 1.) * .5;
+    return out_bounce_internal(p - 1., 1.) * .5 + .5;
+}
+
+
+#define TRANSITION(fname)                                               \
+    static PyObject *                                                   \
+    py_##fname(PyObject *self, PyObject *arg)                           \
+    {                                                                   \
+        double p = PyFloat_AsDouble(arg);                               \
+        if (p == -1. && PyErr_Occurred())                               \
+            return NULL;                                                \
+        return PyFloat_FromDouble(fname(p));                            \
+    }
+
+TRANSITION(linear)
+TRANSITION(in_quad)
+TRANSITION(out_quad)
+TRANSITION(in_out_quad)
+TRANSITION(in_cubic)
+TRANSITION(out_cubic)
+TRANSITION(in_out_cubic)
+TRANSITION(in_quart)
+TRANSITION(out_quart)
+TRANSITION(in_out_quart)
+TRANSITION(in_quint)
+TRANSITION(out_quint)
+TRANSITION(in_out_quint)
+TRANSITION(in_sine)
+TRANSITION(out_sine)
+TRANSITION(in_out_sine)
+TRANSITION(in_expo)
+TRANSITION(out_expo)
+TRANSITION(in_out_expo)
+TRANSITION(in_circ)
+TRANSITION(out_circ)
+TRANSITION(in_out_circ)
+TRANSITION(in_elastic)
+TRANSITION(out_elastic)
+TRANSITION(in_out_elastic)
+TRANSITION(in_back)
+TRANSITION(out_back)
+TRANSITION(in_out_back)
+TRANSITION(in_bounce)
+TRANSITION(out_bounce)
+TRANSITION(in_out_bounce)
+
+PyDoc_STRVAR(curve_value_doc,
+"curve_value(samples, scale, end, transition, interpolate, progress)\n\
+\n\
+Read a baked curve like the pure Python version in bake.py.  samples\n\
+is a tuple of floats.  If interpolate is false, transition is called\n\
+for progress between samples.");
+
+static PyObject *
+curve_value(PyObject *self, PyObject *const *args, Py_ssize_t nargs)
+{
+    PyObject *samples, *item;
+    double scale, progress, position, fraction, a, b;
+    Py_ssize_t index, last;
+    int interpolate;
+
+    if (nargs != 6) {
+        PyErr_SetString(PyExc_TypeError, "curve_value takes 6 arguments");
+        return NULL;
+    }
+    samples = args[0];
+    if (!PyTuple_Check(samples)) {
+        PyErr_SetString(PyExc_TypeError, "samples must be a tuple");
+        return NULL;
+    }
+    scale = PyFloat_AsDouble(args[1]);
+    if (scale == -1. && PyErr_Occurred())
+        return NULL;
+    interpolate = PyObject_IsTrue(args[4]);
+    if (interpolate < 0)
+        return NULL;
+    progress = PyFloat_AsDouble(args[5]);
+    if (progress == -1. && PyErr_Occurred())
+        return NULL;
+
+    last = PyTuple_GET_SIZE(samples) - 1;
+    position = progress * scale;
+    if (!(position >= 0.) || position >= (double)last) {
+        /* the last step can be shorter than the others */
+        if (progress >= 1.) {
+            Py_INCREF(args[2]);
+            return args[2];
+        }
+        return PyObject_CallFunctionObjArgs(args[3], args[5], NULL);
+    }
+
+    index = (Py_ssize_t)position;
+    fraction = position - index;
+    if (fraction < 1e-9) {
+        item = PyTuple_GET_ITEM(samples, index);
+        Py_INCREF(item);
+        return item;
+    }
+    if (fraction > 1. - 1e-9) {
+        item = PyTuple_GET_ITEM(samples, index + 1);
+        Py_INCREF(item);
+        return item;
+    }
+    if (!interpolate)
+        return PyObject_CallFunctionObjArgs(args[3], args[5], NULL);
+
+    a = PyFloat_AsDouble(PyTuple_GET_ITEM(samples, index));
+    b = PyFloat_AsDouble(PyTuple_GET_ITEM(samples, index + 1));
+    return PyFloat_FromDouble(a + (b - a) * fraction);
+}
+
+/* Integer interpolation of FixedAnimation.update */
+
+/* x >> bits, rounding down like Python does for negative numbers */
+static long long
+floor_shift(long long x, int bits)
+{
+    if (x >= 0)
+        return x >> bits;
+    return -((-x - 1) >> bits) - 1;
+}
+
+PyDoc_STRVAR(fixed_step_doc,
+"fixed_step(targets, elapsed, duration, table, fixed_bits, step_bits)\n\
+\n\
+Compute the progress and the value of the lookup table like\n\
+FixedAnimation.update, and set the interpolated value of every property\n\
+of every target.  Returns the progress.  The times and values must be\n\
+ints small enough that the products fit in 63 bits; FixedAnimation\n\
+checks this before using it.");
+
+static PyObject *
+fixed_step(PyObject *self, PyObject *const *args, Py_ssize_t nargs)
+{
+    PyObject *targets, *table, *item, *target, *props, *name, *values;
+    long long elapsed, duration, p, t, t0, t1, half, a, b;
+    int bits, step_bits;
+    Py_ssize_t i, n, pos;
+
+    if (nargs != 6) {
+        PyErr_SetString(PyExc_TypeError, "fixed_step takes 6 arguments");
+        return NULL;
+    }
+    targets = args[0];
+    table = args[3];
+    if (!PyList_Check(targets) || !PyList_Check(table)) {
+        PyErr_SetString(PyExc_TypeError, "targets and table must be lists");
+        return NULL;
+    }
+    elapsed = PyLong_AsLongLong(args[1]);
+    if (elapsed == -1 && PyErr_Occurred())
+        return NULL;
+    duration = PyLong_AsLongLong(args[2]);
+    if (duration == -1 && PyErr_Occurred())
+        return NULL;
+    bits = (int)PyLong_AsLong(args[4]);
+    if (bits == -1 && PyErr_Occurred())
+        return NULL;
+    step_bits = (int)PyLong_AsLong(args[5]);
+    if (step_bits == -1 && PyErr_Occurred())
+        return NULL;
+    /* FixedAnimation only uses this if the duration is below 2 ** 40 */
+    if (duration <= 0 || elapsed < 0) {
+        PyErr_SetString(PyExc_ValueError, "time is out of range");
+        return NULL;
+    }
+    half = 1LL << (bits - 1);
+
+    n = PyList_GET_SIZE(table);
+    if (elapsed >= duration) {
+        p = 1LL << bits;
+        i = n - 1;
+        t = PyLong_AsLongLong(PyList_GET_ITEM(table, i));
+    }
+    else {
+        p = (elapsed << bits) / duration;
+        i = (Py_ssize_t)(p >> step_bits);
+        if (i + 1 >= n) {
+            PyErr_SetString(PyExc_ValueError, "table is too short");
+            return NULL;
+        }
+        t0 = PyLong_AsLongLong(PyList_GET_ITEM(table, i));
+        t1 = PyLong_AsLongLong(PyList_GET_ITEM(table, i + 1));
+        t = t0 + floor_shift((t1 - t0) * (p & ((1LL << step_bits) - 1)),
+                             step_bits);
+    }
+    if (PyErr_Occurred())
+        return NULL;
+
+    n = PyList_GET_SIZE(targets);
+    for (i = 0; i < n; i++) {
+        item = PyList_GET_ITEM(targets, i);
+        if (!PyTuple_Check(item) || PyTuple_GET_SIZE(item) != 2) {
+            PyErr_SetString(PyExc_TypeError, "targets must be 2-tuples");
+            return NULL;
+        }
+        target = PyTuple_GET_ITEM(item, 0);
+        props = PyTuple_GET_ITEM(item, 1);
+        if (!PyDict_Check(props)) {
+            PyErr_SetString(PyExc_TypeError, "props must be a dict");
+            return NULL;
+        }
+
+        pos = 0;
+        while (PyDict_Next(props, &pos, &name, &values)) {
+            if (!PyTuple_Check(values) || PyTuple_GET_SIZE(values) != 2) {
+                PyErr_SetString(PyExc_TypeError, "values must be 2-tuples");
+                return NULL;
+            }
+            a = PyLong_AsLongLong(PyTuple_GET_ITEM(values, 0));
+            if (a == -1 && PyErr_Occurred())
+                return NULL;
+            b = PyLong_AsLongLong(PyTuple_GET_ITEM(values, 1));
+            if (b == -1 && PyErr_Occurred())
+                return NULL;
+
+            Py_INCREF(name);
+            if (set_object(target, name, PyLong_FromLongLong(
+                    a + floor_shift((b - a) * t + half, bits))) < 0) {
+                Py_DECREF(name);
+                return NULL;
+            }
+            Py_DECREF(name);
+        }
+    }
+
+    return PyLong_FromLongLong(p);
+}
+
+
+#define TRANSITION_DEF(fname) {#fname, py_##fname, METH_O, NULL}
+
+static PyMethodDef speedups_methods[] = {
+    {"animation_step", (PyCFunction)(void(*)(void))animation_step, METH_FASTCALL,
+     animation_step_doc},
+    {"curve_value", (PyCFunction)(void(*)(void))curve_value, METH_FASTCALL,
+     curve_value_doc},
+    {"fixed_step", (PyCFunction)(void(*)(void))fixed_step, METH_FASTCALL,
+     fixed_step_doc},
+    TRANSITION_DEF(linear),
+    TRANSITION_DEF(in_quad),
+    TRANSITION_DEF(out_quad),
+    TRANSITION_DEF(in_out_quad),
+    TRANSITION_DEF(in_cubic),
+    TRANSITION_DEF(out_cubic),
+    TRANSITION_DEF(in_out_cubic),
+    TRANSITION_DEF(in_quart),
+    TRANSITION_DEF(out_quart),
+    TRANSITION_DEF(in_out_quart),
+    TRANSITION_DEF(in_quint),
+    TRANSITION_DEF(out_quint),
+    TRANSITION_DEF(in_out_quint),
+    TRANSITION_DEF(in_sine),
+    TRANSITION_DEF(out_sine),
+    TRANSITION_DEF(in_out_sine),
+    TRANSITION_DEF(in_expo),
+    TRANSITION_DEF(out_expo),
+    TRANSITION_DEF(in_out_expo),
+    TRANSITION_DEF(in_circ),
+    TRANSITION_DEF(out_circ),
+    TRANSITION_DEF(in_out_circ),
+    TRANSITION_DEF(in_elastic),
+    TRANSITION_DEF(out_elastic),
+    TRANSITION_DEF(in_out_elastic),
+    TRANSITION_DEF(in_back),
+    TRANSITION_DEF(out_back),
+    TRANSITION_DEF(in_out_back),
+    TRANSITION_DEF(in_bounce),
+    TRANSITION_DEF(out_bounce),
+    TRANSITION_DEF(in_out_bounce),
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef speedups_module = {
+    PyModuleDef_HEAD_INIT,
+    "animation._speedups",
+    "Optional compiled inner loops for the animation package",
+    -1,
+    speedups_methods
+};
+
+PyMODINIT_FUNC
+PyInit__speedups(void)
+{
+    return PyModule_Create(&speedups_module);
+}
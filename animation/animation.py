@@ -3,12 +3,16 @@ from __future__ import print_function
 
 import sys
 from collections import defaultdict
+from heapq import heappop, heappush
+from itertools import count
 
 import pygame
 
-from .transitions import AnimationTransition
+from .backend import speedups
+from .transitions import get_transition
 
-__all__ = ('Task', 'Animation', 'remove_animations_of')
+__all__ = ('Task', 'TaskSequence', 'Animation', 'remove_animations_of',
+           'ViewportCulling')
 
 ANIMATION_NOT_STARTED = 0
 ANIMATION_RUNNING = 1
@@ -24,6 +28,10 @@ if PY2:
 else:
     string_types = text_type = str
 
+number_types = (int, float)
+
+_animation_step = getattr(speedups, 'animation_step', None)
+
 
 def is_number(value):
     """Test if an object is a number.
@@ -31,6 +39,9 @@ def is_number(value):
     :returns: True
     :raises: ValueError
     """
+    if isinstance(value, number_types):
+        return True
+
     try:
         float(value)
     except (ValueError, TypeError):
@@ -39,6 +50,19 @@ def is_number(value):
     return True
 
 
+def make_tags(tags):
+    """ Make the set of tags of a Task or Animation
+
+    :param tags: a tag, or an iterable of tags
+    :returns: frozenset
+    """
+    if tags is None:
+        return frozenset()
+    if isinstance(tags, string_types):
+        return frozenset((tags,))
+    return frozenset(tags)
+
+
 def remove_animations_of(target, group):
     """ Find animations that target objects and remove those animations
 
@@ -46,16 +70,83 @@ def remove_animations_of(target, group):
     :param group: pygame.sprite.Group
     :returns: list of animations that were removed
     """
-    animations = [ani for ani in group.sprites() if isinstance(ani, Animation)]
-    to_remove = [ani for ani in animations
-                 if target in [i[0] for i in ani.targets]]
+    to_remove = [ani for ani in group.sprites()
+                 if isinstance(ani, Animation) and
+                 any(i[0] is target or i[0] == target for i in ani.targets)]
     group.remove(*to_remove)
     return to_remove
 
 
+class ViewportCulling(object):
+    """ Visibility test for Animations of pygame Rects
+
+    Use an instance as Animation.visible, or pass it to AnimationGroup,
+    so Animations of Rects that are not in the viewport do not change
+    the Rects until they are.  The viewport is not copied, so moving it
+    (like a camera) is taken into account.
+
+    The Rect is tested at both the initial and the final values of the
+    animation, and all the space between.  Transitions that overshoot,
+    like 'out_back', can leave that space a bit; use the margin to make
+    the viewport larger.  Targets that are not Rects are always visible.
+
+        viewport = screen.get_rect()
+        animations = AnimationGroup(visible=ViewportCulling(viewport, 16))
+
+    Animations compute the space swept by each Rect once, on the first
+    update that uses the ViewportCulling, so each update only tests it
+    against the viewport.  Attributes of the Rect that are not animated
+    are read at that time.
+    """
+
+    def __init__(self, viewport, margin=0):
+        self.viewport = viewport
+        self.margin = margin
+
+    def swept(self, target, props):
+        """ Get the space a Rect moves over, made larger by the margin
+
+        :param target: object that is animated
+        :param props: dict of names and (initial, final) values
+        :returns: Rect, or None if the target is not a Rect
+        """
+        if not isinstance(target, pygame.Rect):
+            return None
+
+        start = target.copy()
+        end = target.copy()
+        for name, values in props.items():
+            setattr(start, name, values[0])
+            setattr(end, name, values[1])
+        area = start.union(end)
+        if self.margin:
+            area.inflate_ip(self.margin * 2, self.margin * 2)
+        return area
+
+    def __call__(self, target, props):
+        area = self.swept(target, props)
+        return area is None or self.viewport.colliderect(area)
+
+
 class AnimBase(pygame.sprite.Sprite):
     _valid_schedules = []
 
+    # when set by a group, callbacks other than 'on update' are
+    # appended to this list and executed by the group after the tick
+    _queue = None
+
+    # callbacks with a higher priority run first when using a CallbackBudget
+    priority = 0
+
+    # AnimationGroup updates the Task/Animation once every 'tier' updates
+    tier = 1
+
+    # AnimationGroup keeps an index of members by tag; set before adding
+    tags = frozenset()
+
+    # _set_value rounds values to ints if True
+    _round_values = False
+
     def __init__(self):
         super(AnimBase, self).__init__()
         self._callbacks = defaultdict(list)
@@ -86,12 +177,44 @@ class AnimBase(pygame.sprite.Sprite):
         self._callbacks[when].append(func)
 
     def _execute_callbacks(self, when):
-        try:
-            callbacks = self._callbacks[when]
-        except KeyError:
+        if self._queue is not None and when != 'on update':
+            self._queue.append((self, when))
             return
+
+        self._run_callbacks(when)
+
+    def _run_callbacks(self, when):
+        # get, so members without callbacks do not get an empty list
+        callbacks = self._callbacks.get(when)
+        if callbacks:
+            for cb in callbacks:
+                cb()
+
+    def _set_value(self, target, name, value):
+        """ Set a value on some other object
+
+        If the name references a callable type, then
+        the object of that name will be called with 'value'
+        as the first and only argument.
+
+        Because callables are 'write only', there is no way
+        to determine the initial value.  you can supply
+        an initial value in the constructor as a value or
+        reference to a callable object.
+
+        :param target: object to be modified
+        :param name: name of attribute to be modified
+        :param value: value
+        :returns: None
+        """
+        if self._round_values:
+            value = int(round(value, 0))
+
+        attr = getattr(target, name)
+        if callable(attr):
+            attr(value)
         else:
-            [cb() for cb in callbacks]
+            setattr(target, name, value)
 
 
 class Task(AnimBase):
@@ -139,10 +262,13 @@ class Task(AnimBase):
         task.chain(Task(something_else))
 
         When chaining tasks, do not add the chained tasks to a group.
+
+        # tag tasks to abort them together; see AnimationGroup
+        task = Task(spawn_enemy, 5000, -1, tags=('room 4',))
     """
     _valid_schedules = ('on interval', 'on finish', 'on abort')
 
-    def __init__(self, callback, interval=0, times=1):
+    def __init__(self, callback, interval=0, times=1, tags=None):
         if not callable(callback):
             raise ValueError
 
@@ -155,6 +281,7 @@ class Task(AnimBase):
         self._duration = 0
         self._chain = list()
         self._state = ANIMATION_RUNNING
+        self.tags = make_tags(tags)
         self.schedule(callback)
 
     def chain(self, *others):
@@ -202,6 +329,15 @@ class Task(AnimBase):
             else:   # loops == -1, run forever
                 self._execute_callbacks("on interval")
 
+    def time_until_next_event(self):
+        """ Get the time until the Task needs to be updated again
+
+        :returns: time, or None if the Task is finished
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return None
+        return max(0, self._interval - self._duration)
+
     def finish(self):
         """ Force task to finish, while executing callbacks
         """
@@ -227,6 +363,162 @@ class Task(AnimBase):
             task.add(*groups)
 
 
+class TaskSequence(AnimBase):
+    """ Run a Task and everything chained to it without any group churn
+
+    A chain of Tasks normally works by adding the chained Tasks to
+    the groups of the first Task when it finishes.  Long sequences,
+    like cutscenes, will add and remove a Task from the groups for
+    each link, and there is no way to know how long it will take.
+
+    TaskSequence computes when each Task of the chain starts and
+    keeps the upcoming intervals in one heap.  Only the sequence is
+    added to the group; the Tasks of the chain never are.
+
+        first = Task(open_door, 1000)
+        second = Task(walk_in, 500)
+        first.chain(second)
+        second.chain(Task(close_door, 250))
+        sequence = TaskSequence(first)
+        group.add(sequence)
+
+        sequence.duration    # 1750
+        sequence.remaining   # time left
+
+    Because the start of each Task is known, a chained Task starts
+    exactly when the previous one finishes, not on the next update.
+    Unlike Task, every interval that is due is executed during an
+    update, in order.  The duration is computed when the sequence is
+    created.  Tasks that repeat forever cannot be used; ValueError
+    will be raised.
+    """
+    _valid_schedules = ('on finish',)
+
+    def __init__(self, *tasks):
+        super(TaskSequence, self).__init__()
+        self._elapsed = 0
+        self._state = ANIMATION_RUNNING
+        self._heap = list()
+        self._counter = count()
+        self._duration = 0
+        for task in tasks:
+            if not isinstance(task, Task):
+                raise TypeError
+            self._duration = max(self._duration, self._end_of(task, 0))
+            self._push(task, 0)
+
+    @staticmethod
+    def _end_of(task, start):
+        """ Get the time the task and all tasks chained to it will end
+
+        The chain is walked with a stack, not recursion, so chains of
+        any length can be used.
+
+        :param task: Task
+        :param start: time the task starts
+        :returns: time
+        """
+        latest = start
+        stack = [(task, start)]
+        while stack:
+            task, start = stack.pop()
+            if task._loops <= -1:
+                raise ValueError
+            end = start + task._interval * task._loops
+            latest = max(latest, end)
+            for other in task._chain:
+                stack.append((other, end))
+        return latest
+
+    def _push(self, task, start):
+        heappush(self._heap, (start + task._interval, next(self._counter),
+                              task, task._loops))
+
+    @property
+    def duration(self):
+        """ Total time of the sequence """
+        return self._duration
+
+    @property
+    def elapsed(self):
+        return self._elapsed
+
+    @property
+    def remaining(self):
+        """ Time until the sequence is finished """
+        return max(0, self._duration - self._elapsed)
+
+    def time_until_next_event(self):
+        """ Get the time until the next interval of a Task is due
+
+        :returns: time, or None if the sequence is finished
+        """
+        if self._state is not ANIMATION_RUNNING or not self._heap:
+            return None
+        return max(0, self._heap[0][0] - self._elapsed)
+
+    def _fire(self, time, task, loops):
+        """ Execute the interval of a Task that is due at time
+
+        :returns: None
+        """
+        if task._state is not ANIMATION_RUNNING:
+            return      # aborted, so the chain is skipped too
+
+        task._queue = self._queue
+        if loops > 1:
+            task._loops = loops - 1
+            task._execute_callbacks("on interval")
+            heappush(self._heap, (time + task._interval,
+                                  next(self._counter), task, loops - 1))
+        else:
+            chain = task._chain
+            task._chain = ()    # the sequence starts the chain, not groups
+            task.finish()
+            for other in chain:
+                self._push(other, time)
+
+    def update(self, dt):
+        """ Update the sequence and execute all intervals that are due
+
+        :param dt: Time passed since last update.
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return
+
+        self._elapsed += dt
+        heap = self._heap
+        while heap and heap[0][0] <= self._elapsed:
+            time, _, task, loops = heappop(heap)
+            self._fire(time, task, loops)
+
+        if not heap:
+            self.finish()
+
+    def finish(self):
+        """ Force all remaining Tasks to finish, while executing callbacks
+
+        Each remaining Task will be finished like Task.finish.
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return
+
+        heap = self._heap
+        while heap:
+            time, _, task, loops = heappop(heap)
+            self._fire(time, task, 1)
+        self._state = ANIMATION_FINISHED
+        self.kill()
+        self._execute_callbacks("on finish")
+
+    def abort(self):
+        """ Stop the sequence, without executing callbacks
+        """
+        self._state = ANIMATION_FINISHED
+        self._heap = list()
+        self.kill()
+
+
 class Animation(AnimBase):
     """ Change numeric values over time
 
@@ -267,6 +559,13 @@ class Animation(AnimBase):
     You can optionally delay the start of the animation using the
     delay keyword.
 
+    Pass a BakeCache as the bake keyword to share the sampled
+    transition with other Animations of the same duration.
+
+    Pass a tag, or a tuple of tags, as the tags keyword to finish,
+    abort or pause animations by tag with an AnimationGroup:
+        ani = Animation(button.rect, y=0, tags='menu')
+
 
     Callable Attributes
     ===================
@@ -289,11 +588,28 @@ class Animation(AnimBase):
 
     The 'round_values' parameter will be set to True automatically
     if pygame rects are used as an animation target.
+
+
+    Culling
+    =======
+
+    Set the 'visible' attribute to a callable to skip work for targets
+    that cannot be seen.  It is called with each target and the dict of
+    (initial, final) values of the target, and should return False if
+    the target is not visible.  The values of targets that are not
+    visible are not changed; they are set to the correct value on the
+    first update they are visible again, or when the animation
+    finishes.  Callbacks are executed like normal.
+
+        ani.visible = lambda target, props: target in on_screen
     """
     _valid_schedules = ('on finish', 'on update')
     default_duration = 1000.
     default_transition = 'linear'
 
+    # callable(target, props) that returns False for targets not seen
+    visible = None
+
     def __init__(self, *targets, **kwargs):
         super(Animation, self).__init__()
         self._targets = list()
@@ -305,11 +621,24 @@ class Animation(AnimBase):
         self._transition = kwargs.get('transition', self.default_transition)
         self._initial = kwargs.get('initial', None)
         self._relative = kwargs.get('relative', False)
-        if isinstance(self._transition, string_types):
-            self._transition = getattr(AnimationTransition, self._transition)
+        self._transition = get_transition(self._transition)
         self._elapsed = 0.
+        self._swept = None      # (culling, margin, [(rect, [pair])])
+        self.tags = make_tags(kwargs.get('tags', None))
+        bake = kwargs.get('bake', None)
+        if bake is not None:
+            curve = bake.curve(self._transition, self._duration)
+            if curve is not None:
+                self._transition = curve.function
+
+        # the compiled loop can only be used if _set_value is not replaced
+        self._step = None
+        if (_animation_step is not None and
+                type(self)._set_value is AnimBase._set_value):
+            self._step = _animation_step
+
         for key in ('duration', 'transition', 'round_values', 'delay',
-                    'initial', 'relative'):
+                    'initial', 'relative', 'tags', 'bake'):
             kwargs.pop(key, None)
         if not kwargs:
             raise ValueError
@@ -339,48 +668,51 @@ class Animation(AnimBase):
 
         return value
 
-    def _set_value(self, target, name, value):
-        """ Set a value on some other object
+    def _gather_initial_values(self):
+        """ Read initial values of every target and build the props table
 
-        If the name references a callable type, then
-        the object of that name will be called with 'value'
-        as the first and only argument.
+        The end values are checked once for the whole animation, not
+        once for each target.
 
-        Because callables are 'write only', there is no way
-        to determine the initial value.  you can supply
-        an initial value in the constructor as a value or
-        reference to a callable object.
+        Returns True if the values need to be 'primed' with update(0).
+        This is only the case if one of the following is true:
+        a target attribute is callable, an initial value was passed,
+        values are rounded, or the transition does not start at 0.
+        Otherwise the first update would only write back the values
+        that were just read.
 
-        :param target: object to be modified
-        :param name: name of attribute to be modified
-        :param value: value
-        :returns: None
+        :returns: bool
         """
-        if self._round_values:
-            value = int(round(value, 0))
+        props = self.props
+        initial = self._initial
+        relative = self._relative
+        for value in props.values():
+            is_number(value)
 
-        attr = getattr(target, name)
-        if callable(attr):
-            attr(value)
-        else:
-            setattr(target, name, value)
+        prime = (initial is not None or self._round_values or
+                 self._transition(0.) != 0.)
 
-    def _gather_initial_values(self):
         self._targets = list()
+        self._swept = None
         for target in self._pre_targets:
-            props = dict()
             if isinstance(target, pygame.Rect):
-                self._round_values = True
-            for name, value in self.props.items():
-                initial = self._get_value(target, name)
-                is_number(initial)
-                is_number(value)
-                if self._relative:
-                    value += initial
-                props[name] = initial, value
-            self._targets.append((target, props))
-
-        self.update(0)  # required to 'prime' initial values of callable targets
+                self._round_values = prime = True
+            values = dict()
+            for name, value in props.items():
+                if initial is None:
+                    start = getattr(target, name)
+                    if callable(start):
+                        start = start()
+                        prime = True
+                else:
+                    start = self._get_value(target, name)
+                is_number(start)
+                if relative:
+                    value += start
+                values[name] = start, value
+            self._targets.append((target, values))
+
+        return prime
 
     def update(self, dt):
         """ Update the animation
@@ -408,17 +740,33 @@ class Animation(AnimBase):
         if self._delay > 0:
             if self._elapsed > self._delay:
                 self._elapsed -= self._delay
-                self._gather_initial_values()
+                if self._gather_initial_values():
+                    self.update(0)
                 self._delay = 0
             return
 
-        p = min(1., self._elapsed / self._duration)
-        t = self._transition(p)
-        for target, props in self._targets:
-            for name, values in props.items():
-                a, b = values
-                value = (a * (1. - t)) + (b * t)
-                self._set_value(target, name, value)
+        visible = self.visible
+        if self._step is not None and visible is None:
+            p = self._step(self._targets, self._elapsed, self._duration,
+                           self._transition, self._round_values)
+        elif isinstance(visible, ViewportCulling):
+            p = self._update_in_viewport(visible)
+        else:
+            # not min(), which packs its arguments in a tuple
+            p = self._elapsed / self._duration
+            if p > 1.:
+                p = 1.
+            t = None
+            for target, props in self._targets:
+                if visible is not None and not visible(target, props):
+                    continue
+                if t is None:
+                    t = self._transition(p)
+                # not items(), which makes a view and a tuple each update
+                for name in props:
+                    a, b = props[name]
+                    value = (a * (1. - t)) + (b * t)
+                    self._set_value(target, name, value)
 
         # update will be called with 0 it init the delay, but we
         # don't want to call the update callback in that case
@@ -428,6 +776,70 @@ class Animation(AnimBase):
         if p >= 1:
             self.finish()
 
+    def _update_in_viewport(self, culling):
+        """ Update the targets that are in the viewport of a ViewportCulling
+
+        The space swept by each target is computed once, so each update
+        only tests it against the viewport.  The targets that are seen
+        are updated with the compiled step, if it can be used.
+
+        :param culling: ViewportCulling
+        :returns: progress
+        """
+        swept = self._swept
+        if (swept is None or swept[0] is not culling or
+                swept[1] != culling.margin):
+            swept = self._swept = culling, culling.margin, [
+                (culling.swept(target, props), [(target, props)])
+                for target, props in self._targets]
+
+        viewport = culling.viewport
+        step = self._step
+        p = self._elapsed / self._duration
+        if p > 1.:
+            p = 1.
+        t = None
+        for area, pair in swept[2]:
+            if area is not None and not viewport.colliderect(area):
+                continue
+            if step is not None:
+                step(pair, self._elapsed, self._duration, self._transition,
+                     self._round_values)
+                continue
+            if t is None:
+                t = self._transition(p)
+            target, props = pair[0]
+            for name in props:
+                a, b = props[name]
+                self._set_value(target, name, (a * (1. - t)) + (b * t))
+        return p
+
+    def time_until_next_event(self):
+        """ Get the time until the Animation needs to be updated again
+
+        While the animation is delayed, this is the time left until
+        the delay is over.  A running animation changes values each
+        update, so it is always 0.
+
+        :returns: time, or None if the Animation is not running
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return None
+        if self._delay > 0:
+            return max(0, self._delay - self._elapsed)
+        return 0
+
+    def time_until_next_callback(self):
+        """ Get the time until the delay is over, or the Animation finishes
+
+        :returns: time, or None if the Animation is not running
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return None
+        if self._delay > 0:
+            return max(0, self._delay - self._elapsed)
+        return max(0, self._duration - self._elapsed)
+
     def finish(self):
         """ Force animation to finish, apply transforms, and execute callbacks
 
@@ -491,5 +903,63 @@ class Animation(AnimBase):
         self._pre_targets = targets
 
         if self._delay == 0:
-            self._gather_initial_values()
+            if self._gather_initial_values():
+                self.update(0)  # required to 'prime' initial values of callable targets
+
+    @classmethod
+    def start_many(cls, pairs):
+        """ Start many animations at once
+
+        Use this when a lot of animations are started on the same
+        frame, like moving a formation of sprites.  Initial values are
+        read in one sweep, and only the animations that need it are
+        primed with update(0) afterwards.
+
+        Either all of the animations are started, or none are.  If one
+        was already started or is in pairs twice, RuntimeError is
+        raised before anything is changed.  If reading the initial
+        values fails, like ValueError for values that are not numbers,
+        every animation is left not started and the error is raised.
+
+            animations = Animation.start_many(
+                (Animation(x=x, y=y), sprite.rect) for ...)
+            group.add(*animations)
+
+        :param pairs: iterable of (animation, target) tuples
+        :returns: list of the animations that were started
+        :raises: RuntimeError
+        """
+        pairs = list(pairs)
+        seen = set()
+        for animation, target in pairs:
+            if animation._state is not ANIMATION_NOT_STARTED:
+                raise RuntimeError
+            if animation in seen:
+                raise RuntimeError
+            seen.add(animation)
+
+        started = list()
+        to_prime = list()
+        rounding = [animation._round_values for animation, target in pairs]
+        try:
+            for animation, target in pairs:
+                animation._state = ANIMATION_RUNNING
+                animation._pre_targets = (target,)
+                if animation._delay == 0:
+                    if animation._gather_initial_values():
+                        to_prime.append(animation)
+                started.append(animation)
+        except Exception:
+            # undo, so the animations can be fixed and started again
+            for (animation, target), round_values in zip(pairs, rounding):
+                animation._state = ANIMATION_NOT_STARTED
+                animation._pre_targets = list()
+                animation._targets = list()
+                animation._round_values = round_values
+            raise
+
+        for animation in to_prime:
+            animation.update(0)
+
+        return started
 
@@ -0,0 +1,19 @@
+""" Select the compiled speedups, if they are available
+
+The speedups are an optional C extension with faster versions of the
+inner loop of Animation.update and the transitions.  If
+it was not built, or the ANIMATION_PURE_PYTHON environment variable is
+set, the pure Python versions are used.  Both give the same results.
+"""
+import os
+
+__all__ = ('BACKEND', 'speedups')
+
+speedups = None
+if not os.environ.get('ANIMATION_PURE_PYTHON'):
+    try:
+        from . import _speedups as speedups
+    except ImportError:
+        speedups = None
+
+BACKEND = 'python' if speedups is None else 'c'
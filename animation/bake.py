@@ -0,0 +1,179 @@
+from __future__ import division
+from __future__ import print_function
+
+from collections import OrderedDict
+from functools import partial
+
+from .backend import speedups
+
+__all__ = ('BakeCache', 'BakedCurve')
+
+
+def _curve_value(samples, scale, end, transition, interpolate, progress):
+    """ Read a baked curve
+
+    This is the reference for the compiled version in the speedups.
+    """
+    last = len(samples) - 1
+    position = progress * scale
+    if not position >= 0. or position >= last:
+        # the last step can be shorter than the others
+        if progress >= 1.:
+            return end
+        return transition(progress)
+
+    index = int(position)
+    fraction = position - index
+    if fraction < 1e-9:
+        return samples[index]
+    if fraction > 1. - 1e-9:
+        return samples[index + 1]
+    if not interpolate:
+        return transition(progress)
+    a = samples[index]
+    return a + (samples[index + 1] - a) * fraction
+
+
+curve_value = getattr(speedups, 'curve_value', _curve_value)
+
+
+class BakedCurve(object):
+    """ A transition sampled once for each frame step of an animation
+
+    The function attribute is used like a transition.  If the progress
+    falls on a sample, the sample is returned.  Otherwise the two
+    samples around it are interpolated, or, if the cache does not
+    interpolate, the transition is computed.
+
+    :ivar samples: tuple of the values of the transition at each step
+    :ivar function: callable taking progress (0-1) and returning a float
+    """
+
+    def __init__(self, cache, transition, duration, step):
+        count = int(duration // step)
+        self.transition = transition
+        self.samples = tuple(transition(i * step / duration)
+                             for i in range(count + 1))
+        if not cache.interpolate:
+            def transition(progress, transition=transition):
+                cache.fallbacks += 1
+                return transition(progress)
+        self.function = partial(curve_value, self.samples, duration / step,
+                                self.transition(1.), transition,
+                                cache.interpolate)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __call__(self, progress):
+        return self.function(progress)
+
+
+class BakeCache(object):
+    """ Share sampled transitions between Animations that are the same
+
+    Button pulses, hit flashes and other tweens often have the same
+    transition and duration.  Pass a BakeCache to an Animation as bake,
+    and the transition is sampled once for each frame step, and the
+    samples are shared by every Animation with the same transition,
+    duration and step:
+
+        flashes = BakeCache(step=16)
+        ani = Animation(sprite, alpha=0, duration=250,
+                        transition='out_bounce', bake=flashes)
+
+    If the animation is updated with the frame step, each update only
+    reads a sample.  Other times fall between two samples, which are
+    interpolated; pass interpolate=False to compute the transition for
+    those times instead, which gives the same values as not baking.
+
+    Curves that were not used for the longest time are removed when
+    there are more than max_samples samples in the cache.  Curves with
+    more samples than that are not baked.
+
+    Transitions that are compiled in the speedups are already fast;
+    baking helps the most with custom transitions and the pure Python
+    backend.
+
+    :ivar hits: number of times a curve was found in the cache
+    :ivar misses: number of times a curve was sampled
+    :ivar evictions: number of curves removed to stay under max_samples
+    :ivar fallbacks: number of times the transition was computed
+                     because interpolate is False
+    """
+
+    def __init__(self, step, max_samples=65536, interpolate=True):
+        if step <= 0 or max_samples <= 0:
+            raise ValueError
+
+        self.step = step
+        self.max_samples = max_samples
+        self.interpolate = interpolate
+        self._curves = OrderedDict()
+        self._samples = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.fallbacks = 0
+
+    def __len__(self):
+        return len(self._curves)
+
+    def curve(self, transition, duration, step=None):
+        """ Get the baked curve of a transition, sampling it if needed
+
+        :param transition: easing function
+        :param duration: duration of the animation
+        :param step: frame step; the step of the cache if None
+        :returns: BakedCurve, or None if the curve is too big to bake
+        """
+        if step is None:
+            step = self.step
+        key = transition, duration, step
+        curves = self._curves
+        try:
+            curve = curves[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            curves[key] = curves.pop(key)
+            return curve
+
+        self.misses += 1
+        if duration <= 0 or duration / step + 1 > self.max_samples:
+            return None
+
+        curve = BakedCurve(self, transition, duration, step)
+        curves[key] = curve
+        self._samples += len(curve)
+        while self._samples > self.max_samples:
+            key, old = curves.popitem(last=False)
+            self._samples -= len(old)
+            self.evictions += 1
+        return curve
+
+    def clear(self):
+        """ Remove all curves
+        """
+        self._curves.clear()
+        self._samples = 0
+
+    def stats(self):
+        """ Get the counters as a dict, to help tuning the cache
+
+        :returns: dict
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'fallbacks': self.fallbacks,
+            'curves': len(self._curves),
+            'samples': self._samples,
+        }
+
+    def reset_stats(self):
+        """ Set all counters to zero
+        """
+        self.hits = self.misses = self.evictions = self.fallbacks = 0
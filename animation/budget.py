@@ -0,0 +1,137 @@
+from __future__ import division
+from __future__ import print_function
+
+from heapq import heappop, heappush
+from itertools import count
+from timeit import default_timer
+
+__all__ = ('CallbackBudget',)
+
+
+class CallbackBudget(object):
+    """ Execute callbacks, but not more than a budget each frame
+
+    When hundreds of Animations finish on the same frame, running
+    all of the callbacks at once can take longer than a frame.  A
+    CallbackBudget will only run callbacks until a count or time limit
+    is reached; the rest are deferred to the next frames.
+
+    Callbacks with a higher priority are run first.  Callbacks with
+    the same priority are run in the order they were submitted.
+
+        budget = CallbackBudget(max_count=50, max_time=.002)
+        budget.submit(some_function)
+        budget.submit(important_function, priority=10)
+
+        # once each frame
+        budget.run()
+
+        # run everything, even if over the budget
+        budget.flush()
+
+    Usually, the budget is passed to an AnimationGroup, which will
+    submit the callbacks of its members and run the budget after each
+    update:
+
+        animations = AnimationGroup(budget=budget)
+
+    Set the priority attribute of an Animation or Task to change the
+    priority of its callbacks.
+
+    The time limit uses the same unit as the clock, which is seconds
+    for the default clock.
+
+    :ivar executed: number of callbacks executed
+    :ivar deferred: number of times a callback was left for another frame
+    :ivar over_budget: number of runs that left callbacks for another frame
+    :ivar max_pending: largest number of callbacks waiting after a run
+    """
+
+    def __init__(self, max_count=None, max_time=None, clock=default_timer):
+        if max_count is None and max_time is None:
+            raise ValueError
+
+        self.max_count = max_count
+        self.max_time = max_time
+        self._clock = clock
+        self._heap = list()
+        self._counter = count()
+        self.executed = 0
+        self.deferred = 0
+        self.over_budget = 0
+        self.max_pending = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def submit(self, func, priority=0):
+        """ Add a callback to run on this or a later frame
+
+        :param func: callable
+        :param priority: higher priorities run first
+        :returns: None
+        """
+        heappush(self._heap, (-priority, next(self._counter), func))
+
+    def run(self):
+        """ Run callbacks until the budget for this frame is used
+
+        At least one callback is run each time, if there are any, so
+        the callbacks are always making progress.
+
+        :returns: number of callbacks run
+        """
+        heap = self._heap
+        max_count = self.max_count
+        max_time = self.max_time
+        clock = self._clock
+        start = clock() if max_time is not None else None
+
+        done = 0
+        while heap:
+            heappop(heap)[2]()
+            done += 1
+            if max_count is not None and done >= max_count:
+                break
+            if max_time is not None and clock() - start >= max_time:
+                break
+
+        self.executed += done
+        pending = len(heap)
+        if pending:
+            self.deferred += pending
+            self.over_budget += 1
+            self.max_pending = max(self.max_pending, pending)
+        return done
+
+    def flush(self):
+        """ Run all callbacks, ignoring the budget
+
+        :returns: number of callbacks run
+        """
+        heap = self._heap
+        done = 0
+        while heap:
+            heappop(heap)[2]()
+            done += 1
+        self.executed += done
+        return done
+
+    def stats(self):
+        """ Get the counters as a dict, to help tuning the budget
+
+        :returns: dict
+        """
+        return {
+            'executed': self.executed,
+            'deferred': self.deferred,
+            'over_budget': self.over_budget,
+            'max_pending': self.max_pending,
+            'pending': len(self._heap),
+        }
+
+    def reset_stats(self):
+        """ Set all counters to zero
+        """
+        self.executed = self.deferred = self.over_budget = 0
+        self.max_pending = 0
@@ -0,0 +1,375 @@
+""" Compact binary format for keyframed animation clips
+
+Clips are stored in a library file that can be memory mapped, and are
+played straight from the buffer; no Python objects are made for the
+keyframes.  Many ClipPlayers can share one Clip.
+
+All numbers are little-endian.  The file is:
+
+    header          8s magic 'ANIMCLIP', u16 version, u16 0, u32 clip count
+    clip table      for each clip: 32s name, u32 first channel,
+                    u32 channel count, u32 keyframe count, u32 offset
+    channel names   for each channel of all clips: 32s name
+    records         for each clip, at its offset, one record per keyframe:
+                    f64 time, u32 easing id, u32 0, f64 value per channel
+
+Names are utf-8 and padded with zeros.  The easing id of a keyframe is
+the transition used from that keyframe to the next; ids are the index
+of the name in EASINGS.  Records are aligned to 8 bytes.
+"""
+from __future__ import division
+from __future__ import print_function
+
+import mmap
+import struct
+from bisect import bisect_right
+
+import pygame
+
+from .animation import AnimBase, is_number, make_tags
+from .animation import ANIMATION_RUNNING, ANIMATION_FINISHED
+from .transitions import get_transition
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ('Clip', 'ClipLibrary', 'ClipPlayer', 'write_clips', 'EASINGS')
+
+MAGIC = b'ANIMCLIP'
+VERSION = 1
+
+# never reorder this; the index is stored in files
+EASINGS = (
+    'linear', 'in_quad', 'out_quad', 'in_out_quad', 'in_cubic', 'out_cubic',
+    'in_out_cubic', 'in_quart', 'out_quart', 'in_out_quart', 'in_quint',
+    'out_quint', 'in_out_quint', 'in_sine', 'out_sine', 'in_out_sine',
+    'in_expo', 'out_expo', 'in_out_expo', 'in_circ', 'out_circ',
+    'in_out_circ', 'in_elastic', 'out_elastic', 'in_out_elastic', 'in_back',
+    'out_back', 'in_out_back', 'in_bounce', 'out_bounce', 'in_out_bounce')
+
+_header = struct.Struct('<8sHHI')
+_clip_entry = struct.Struct('<32sIIII')
+_name = struct.Struct('<32s')
+_time = struct.Struct('<d')
+_transitions = tuple(get_transition(i) for i in EASINGS)
+
+
+def _encode_name(name):
+    data = name.encode('utf-8')
+    if len(data) > 32:
+        raise ValueError
+    return data
+
+
+def _decode_name(data):
+    return data.rstrip(b'\0').decode('utf-8')
+
+
+def write_clips(fp, clips):
+    """ Write clips to a binary file
+
+        write_clips(fp, {
+            'slide_in': (('x', 'y'), [
+                (0, 'out_quad', (0, 0)),
+                (500, 'linear', (100, 20)),
+            ]),
+        })
+
+    :param fp: file object opened for writing in binary mode
+    :param clips: dict of name: (channel names, keyframes); keyframes are
+                  (time, easing name, values), sorted by time
+    :returns: None
+    :raises: ValueError
+    """
+    clips = sorted(clips.items())
+    channels = list()
+    table = list()
+    offset = (_header.size + _clip_entry.size * len(clips) +
+              _name.size * sum(len(i[1][0]) for i in clips))
+    records = list()
+    for name, (names, keyframes) in clips:
+        if not keyframes:
+            raise ValueError
+        record = struct.Struct('<dI4x' + 'd' * len(names))
+        table.append((_encode_name(name), len(channels), len(names),
+                      len(keyframes), offset))
+        channels.extend(names)
+        last = None
+        for time, easing, values in keyframes:
+            if (last is not None and time < last) or len(values) != len(names):
+                raise ValueError
+            for value in values:
+                is_number(value)
+            last = time
+            records.append(record.pack(time, EASINGS.index(easing), *values))
+        offset += record.size * len(keyframes)
+
+    fp.write(_header.pack(MAGIC, VERSION, 0, len(clips)))
+    for entry in table:
+        fp.write(_clip_entry.pack(*entry))
+    for name in channels:
+        fp.write(_name.pack(_encode_name(name)))
+    for record in records:
+        fp.write(record)
+
+
+class Clip(object):
+    """ One clip of a ClipLibrary
+
+    Keyframes are read from the buffer of the library when needed.
+
+    :ivar name: name of the clip
+    :ivar channels: tuple of the names of the animated attributes
+    """
+
+    def __init__(self, buffer, name, channels, count, offset):
+        self.name = name
+        self.channels = channels
+        self._buffer = buffer
+        self._count = count
+        self._offset = offset
+        self._record = struct.Struct('<dI4x' + 'd' * len(channels))
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def duration(self):
+        return self.time(self._count - 1)
+
+    def time(self, index):
+        """ Get the time of a keyframe
+
+        :param index: index of the keyframe
+        :returns: float
+        """
+        return _time.unpack_from(self._buffer,
+                                 self._offset + index * self._record.size)[0]
+
+    def keyframe(self, index):
+        """ Get a keyframe
+
+        :param index: index of the keyframe
+        :returns: (time, transition, tuple of values)
+        """
+        record = self._record.unpack_from(
+            self._buffer, self._offset + index * self._record.size)
+        return record[0], _transitions[record[1]], record[2:]
+
+    def find(self, time, hint=0):
+        """ Get the index of the last keyframe at or before a time
+
+        :param time: time in the clip
+        :param hint: index to start looking from
+        :returns: int
+        """
+        count = self._count
+        index = hint
+        if self.time(index) > time:
+            index = 0
+        # usually the next keyframe, so look there before searching
+        while index + 1 < count and self.time(index + 1) <= time:
+            index += 1
+            if index - hint > 4:
+                return bisect_right(_Times(self), time) - 1
+        return index
+
+    def as_array(self):
+        """ Get the keyframes as a NumPy structured array
+
+        The array is a view of the buffer; nothing is copied.
+
+        :returns: numpy array with time, easing and values fields
+        """
+        dtype = numpy.dtype([('time', '<f8'), ('easing', '<u4'),
+                             ('pad', '<u4'),
+                             ('values', '<f8', (len(self.channels),))])
+        return numpy.frombuffer(self._buffer, dtype, self._count, self._offset)
+
+
+class _Times(object):
+    """ Sequence of the times of a clip, for bisect """
+
+    def __init__(self, clip):
+        self._clip = clip
+
+    def __len__(self):
+        return len(self._clip)
+
+    def __getitem__(self, index):
+        return self._clip.time(index)
+
+
+class ClipLibrary(object):
+    """ A collection of clips read from a binary file
+
+        with ClipLibrary.open('clips.bin') as library:
+            player = ClipPlayer(library['slide_in'], sprite.rect)
+
+    The library can also be made from any object that supports the
+    buffer protocol, like bytes.  Only the clip table is read when the
+    library is opened.
+    """
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self._mmap = None
+        magic, version, _, count = _header.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError
+
+        channel_offset = _header.size + _clip_entry.size * count
+        self._clips = dict()
+        for i in range(count):
+            entry = _clip_entry.unpack_from(buffer,
+                                            _header.size + _clip_entry.size * i)
+            name, first, channels, keys, offset = entry
+            names = tuple(_decode_name(_name.unpack_from(
+                buffer, channel_offset + _name.size * (first + j))[0])
+                for j in range(channels))
+            name = _decode_name(name)
+            self._clips[name] = Clip(buffer, name, names, keys, offset)
+
+    @classmethod
+    def open(cls, path):
+        """ Memory map a clip library file
+
+        :param path: path of the file
+        :returns: ClipLibrary
+        """
+        with open(path, 'rb') as fp:
+            buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        library = cls(buffer)
+        library._mmap = buffer
+        return library
+
+    def close(self):
+        """ Close the memory map, if the library was opened from a file
+        """
+        if self._mmap is not None:
+            self._clips.clear()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getitem__(self, name):
+        return self._clips[name]
+
+    def __contains__(self, name):
+        return name in self._clips
+
+    def __iter__(self):
+        return iter(self._clips)
+
+    def __len__(self):
+        return len(self._clips)
+
+
+class ClipPlayer(AnimBase):
+    """ Play a Clip on targets
+
+    Players only keep their own time and position in the clip, so
+    any number of players can share one clip.  Use offset to start
+    the clip at a later time, like staggering a crowd.
+
+        for i, sprite in enumerate(crowd):
+            group.add(ClipPlayer(library['wave'], sprite.rect, offset=i * 50))
+
+    Values are set like Animation does.  The player finishes after the
+    last keyframe, unless loop is True.
+    """
+    _valid_schedules = ('on finish', 'on update')
+
+    def __init__(self, clip, *targets, **kwargs):
+        super(ClipPlayer, self).__init__()
+        if not targets:
+            raise ValueError
+        self._clip = clip
+        self._targets = targets
+        self._elapsed = kwargs.get('offset', 0)
+        self._loop = kwargs.get('loop', False)
+        self._round_values = kwargs.get('round_values', False)
+        for target in targets:
+            if isinstance(target, pygame.Rect):
+                self._round_values = True
+        self._index = 0
+        self.tags = make_tags(kwargs.get('tags', None))
+        self._state = ANIMATION_RUNNING
+
+    def _apply(self, values):
+        for target in self._targets:
+            for name, value in zip(self._clip.channels, values):
+                self._set_value(target, name, value)
+
+    def time_until_next_event(self):
+        """ A running player changes values each update, so this is 0
+
+        :returns: 0, or None if the player is finished
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return None
+        return 0
+
+    def time_until_next_callback(self):
+        """ Get the time until the player will finish
+
+        :returns: time, or None if the player is not running or loops
+        """
+        if self._state is not ANIMATION_RUNNING or self._loop:
+            return None
+        return max(0, self._clip.duration - self._elapsed)
+
+    def update(self, dt):
+        """ Update the player
+
+        :param dt: Time passed since last update.
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return
+
+        clip = self._clip
+        self._elapsed += dt
+        duration = clip.duration
+        if self._elapsed >= duration or len(clip) == 1:
+            if not self._loop or duration <= 0 or len(clip) == 1:
+                self.finish()
+                return
+            self._elapsed %= duration
+
+        index = self._index = clip.find(self._elapsed, self._index)
+        time, transition, values = clip.keyframe(index)
+        next_time, _, next_values = clip.keyframe(index + 1)
+        span = next_time - time
+        p = max(0., (self._elapsed - time) / span) if span > 0 else 0.
+        t = transition(p)
+        for target in self._targets:
+            for name, a, b in zip(clip.channels, values, next_values):
+                self._set_value(target, name, (a * (1. - t)) + (b * t))
+
+        if dt:
+            self._execute_callbacks("on update")
+
+    def finish(self):
+        """ Apply the values of the last keyframe, and finish
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return
+        self._apply(self._clip.keyframe(len(self._clip) - 1)[2])
+        self._execute_callbacks("on update")
+        self.abort()
+
+    def abort(self):
+        """ Stop without changing the values
+
+        Finish callbacks will be executed.
+        """
+        self._state = ANIMATION_FINISHED
+        self.kill()
+        self._execute_callbacks("on finish")
@@ -0,0 +1,95 @@
+from __future__ import division
+from __future__ import print_function
+
+__all__ = ('VirtualClock',)
+
+
+class VirtualClock(object):
+    """ Drive an AnimationGroup with simulated time
+
+    Updating a group with a big dt is not the same as updating it
+    many times with small ones; a Task fires at most once each update,
+    and callbacks would run in the order of the group, not in the
+    order they were due.  A VirtualClock updates the group once for
+    each callback instead, jumping straight from one to the next, so
+    an hour of game time can be run in a moment for tests or replays.
+
+        clock = VirtualClock(animations, step=16)
+        clock.advance(60 * 60 * 1000)   # one hour, in milliseconds
+
+    Members that change on every update without knowing when they
+    finish, like StreamTracks, or Tasks with an interval of 0, are
+    updated once for every step.  A step should be like the frame time
+    of the game.  Callbacks that are due at the same time run in the
+    order of the group.  'on update' callbacks are executed once for
+    each update, not once for each frame the game would have had.
+
+    :ivar time: simulated time that has passed
+    :ivar updates: number of times the group was updated
+    """
+
+    def __init__(self, group, step, time=0):
+        if step <= 0:
+            raise ValueError
+        self.group = group
+        self.step = step
+        self.time = time
+        self.updates = 0
+
+    def _next_dt(self, remaining):
+        """ Get the time to pass to the next update of the group
+
+        :param remaining: time left to simulate
+        :returns: time
+        """
+        wait = self.group.time_until_next_callback()
+        if wait is None or wait >= remaining:
+            return remaining
+        if wait > 0:
+            return wait
+        return min(self.step, remaining)
+
+    def advance(self, time):
+        """ Simulate time passing, running callbacks in the order they are due
+
+        :param time: time to simulate
+        :returns: number of times the group was updated
+        """
+        end = self.time + time
+        updates = 0
+        while self.time < end:
+            dt = self._next_dt(end - self.time)
+            # callbacks see the time they were due
+            self.time += dt
+            self.group.update(dt)
+            updates += 1
+        self.updates += updates
+        return updates
+
+    def run(self, limit=None):
+        """ Simulate time until nothing in the group is scheduled
+
+        Looping Tasks are never done, so pass a limit if the group
+        can contain them.
+
+        :param limit: most time to simulate, or None for no limit
+        :returns: number of times the group was updated
+        """
+        start = self.time
+        updates = 0
+        while True:
+            wait = self.group.time_until_next_callback()
+            if wait is None:
+                break
+            dt = wait if wait > 0 else self.step
+            if limit is not None:
+                remaining = start + limit - self.time
+                if remaining <= 0:
+                    break
+                dt = min(dt, remaining)
+            # callbacks see the time they were due
+            self.time += dt
+            self.group.update(dt)
+            updates += 1
+        self.updates += updates
+        return updates
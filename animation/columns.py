@@ -0,0 +1,256 @@
+from __future__ import division
+from __future__ import print_function
+
+from array import array
+
+from .animation import AnimBase, is_number, make_tags
+from .animation import ANIMATION_RUNNING, ANIMATION_FINISHED
+from .transitions import get_transition
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ('ColumnAnimation',)
+
+# typecodes of integer arrays from the array module
+INTEGER_TYPECODES = 'bBhHiIlLqQ'
+
+
+def flush_column_writes(writes):
+    """ Write all values queued by ColumnAnimations with one write per column
+
+    :param writes: dict of id(column): (column, [indices], [values])
+    :returns: None
+    """
+    for column, indices, values in writes.values():
+        if len(indices) == 1:
+            column[indices[0]] = values[0]
+        else:
+            column[numpy.concatenate(indices)] = numpy.concatenate(values)
+    writes.clear()
+
+
+class ColumnAnimation(AnimBase):
+    """ Change numbers stored in an array over time
+
+    Use this if entities are stored as columns of numbers, like
+    NumPy arrays, instead of objects with attributes.  The target is
+    a column and an index, a slice or a sequence of indices into it.
+    No proxy objects are needed.
+
+        xs = numpy.zeros(1000)
+
+        # move entity 10
+        ani = ColumnAnimation(xs, 10, 100, duration=1000)
+
+        # move entities 0-99 to the same value
+        ani = ColumnAnimation(xs, slice(0, 100), 100, duration=1000)
+
+        # move some entities, each to its own value
+        ani = ColumnAnimation(xs, [3, 5, 8], [10, 20, 30], duration=1000)
+
+    Values may be a single number or one number for each index.  The
+    animation starts right away; the keywords duration, transition,
+    delay, relative, round_values and tags work like they do for Animation.
+
+    If NumPy is installed and the column is a NumPy array, then all
+    values are computed at once.  Also, ColumnAnimations that are in
+    an AnimationGroup do not write to the column when updated.  The
+    group collects the values of all the ColumnAnimations that share a
+    column and writes them with one scatter write after the update.
+    Because of this, 'on update' callbacks will see the old values.
+
+    Other columns, like lists or arrays from the array module, are
+    changed one value at a time.
+
+    Values are rounded automatically for integer NumPy arrays and
+    integer arrays from the array module.
+    """
+    _valid_schedules = ('on finish', 'on update')
+    default_duration = 1000.
+    default_transition = 'linear'
+
+    # when set by a group, values are queued here instead of written
+    _writes = None
+
+    def __init__(self, column, index, value, **kwargs):
+        super(ColumnAnimation, self).__init__()
+        self._column = column
+        self._delay = kwargs.get('delay', 0)
+        self._state = ANIMATION_RUNNING
+        self._round_values = kwargs.get('round_values', False)
+        self._duration = float(kwargs.get('duration', self.default_duration))
+        self._transition = kwargs.get('transition', self.default_transition)
+        self._relative = kwargs.get('relative', False)
+        self._transition = get_transition(self._transition)
+        self._elapsed = 0.
+        self.tags = make_tags(kwargs.get('tags', None))
+        self._vectorized = (numpy is not None and
+                            isinstance(column, numpy.ndarray))
+        # like Animation does for Rects, so values are not truncated
+        if self._vectorized:
+            if column.dtype.kind in 'iu':
+                self._round_values = True
+        elif (isinstance(column, array) and
+                column.typecode in INTEGER_TYPECODES):
+            self._round_values = True
+        self._index = self._normalize_index(index)
+        self._value = value
+        self._initial = None
+        self._final = None
+        if self._delay == 0:
+            self._gather_initial_values()
+
+    def _normalize_index(self, index):
+        """ Convert an index, slice or sequence to a sequence of indices
+
+        :param index: int, slice or sequence of ints
+        :returns: numpy array if vectorized, otherwise list
+        """
+        if isinstance(index, slice):
+            index = range(*index.indices(len(self._column)))
+        elif not hasattr(index, '__len__'):
+            index = [index]
+
+        if self._vectorized:
+            return numpy.asarray(index, dtype=numpy.intp)
+        return list(index)
+
+    def _gather_initial_values(self):
+        count = len(self._index)
+        value = self._value
+        if hasattr(value, '__len__'):
+            if len(value) != count:
+                raise ValueError
+            final = list(value)
+        else:
+            final = [value] * count
+        for value in final:
+            is_number(value)
+
+        column = self._column
+        if self._vectorized:
+            self._initial = column[self._index].astype(float)
+            self._final = numpy.asarray(final, dtype=float)
+        else:
+            self._initial = [float(column[i]) for i in self._index]
+            self._final = [float(i) for i in final]
+
+        if self._relative:
+            if self._vectorized:
+                self._final += self._initial
+            else:
+                self._final = [a + b for a, b in zip(self._initial,
+                                                     self._final)]
+
+    def _values_at(self, t):
+        """ Get the values for the transformed progress t
+
+        :param t: float
+        :returns: numpy array or list
+        """
+        if self._vectorized:
+            values = self._initial * (1. - t) + self._final * t
+            if self._round_values:
+                values = numpy.rint(values)
+            return values
+
+        s = 1. - t
+        values = [a * s + b * t for a, b in zip(self._initial, self._final)]
+        if self._round_values:
+            values = [int(round(i, 0)) for i in values]
+        return values
+
+    def _write(self, values, queue=True):
+        """ Write values to the column, or queue them for the group
+
+        :param values: numpy array or list
+        :param queue: if False, always write values now
+        :returns: None
+        """
+        column = self._column
+        if self._vectorized:
+            writes = self._writes
+            if queue and writes is not None:
+                key = id(column)
+                try:
+                    entry = writes[key]
+                except KeyError:
+                    entry = writes[key] = column, list(), list()
+                entry[1].append(self._index)
+                entry[2].append(values)
+            else:
+                column[self._index] = values
+        else:
+            for i, value in zip(self._index, values):
+                column[i] = value
+
+    def update(self, dt):
+        """ Update the animation
+
+        :param dt: Time passed since last update.
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return
+
+        self._elapsed += dt
+        if self._delay > 0:
+            if self._elapsed > self._delay:
+                self._elapsed -= self._delay
+                self._gather_initial_values()
+                self._delay = 0
+            return
+
+        p = min(1., self._elapsed / self._duration)
+        self._write(self._values_at(self._transition(p)))
+
+        if dt:
+            self._execute_callbacks("on update")
+
+        if p >= 1:
+            self.finish()
+
+    def time_until_next_event(self):
+        """ Get the time until the animation needs to be updated again
+
+        :returns: time, or None if the animation is finished
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return None
+        if self._delay > 0:
+            return max(0, self._delay - self._elapsed)
+        return 0
+
+    def time_until_next_callback(self):
+        """ Get the time until the delay is over, or the animation finishes
+
+        :returns: time, or None if the animation is not running
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return None
+        if self._delay > 0:
+            return max(0, self._delay - self._elapsed)
+        return max(0, self._duration - self._elapsed)
+
+    def finish(self):
+        """ Force animation to finish, apply final values, and execute callbacks
+
+        :returns: None
+        """
+        if self._final is not None:
+            self._write(self._values_at(1.), False)
+
+        self._execute_callbacks("on update")
+        self.abort()
+
+    def abort(self):
+        """ Force animation to finish, without changing the values
+
+        :returns: None
+        """
+        self._state = ANIMATION_FINISHED
+        self._initial = self._final = None
+        self.kill()
+        self._execute_callbacks("on finish")
@@ -0,0 +1,280 @@
+from __future__ import division
+from __future__ import print_function
+
+from math import floor, ldexp, pi
+from numbers import Integral
+from zlib import crc32
+
+from .animation import Animation, ANIMATION_RUNNING
+from .backend import speedups
+from .transitions import AnimationTransition, get_transition, \
+    transition_info
+
+__all__ = ('FixedAnimation', 'fixed_table', 'table_checksum')
+
+FIXED_BITS = 16
+ONE = 1 << FIXED_BITS
+HALF = ONE >> 1
+TABLE_BITS = 10
+TABLE_SIZE = 1 << TABLE_BITS
+STEP_BITS = FIXED_BITS - TABLE_BITS
+STEP_MASK = (1 << STEP_BITS) - 1
+
+# values must be below this for the compiled step, so that the products
+# of the interpolation fit in 63 bits
+STEP_LIMIT = 1 << 40
+
+_tables = dict()
+
+_fixed_step = getattr(speedups, 'fixed_step', None)
+
+
+# The transitions below use sin, cos and pow, which are not required
+# to give the same result on every platform.  These versions only use
+# IEEE 754 add, multiply, divide and floor, which are exact everywhere.
+
+def _sin(x):
+    x -= 2. * pi * floor(x / (2. * pi) + .5)
+    x2 = x * x
+    term = x
+    total = x
+    for i in range(1, 14):
+        term *= -x2 / ((2 * i) * (2 * i + 1))
+        total += term
+    return total
+
+
+def _cos(x):
+    return _sin(x + pi / 2.)
+
+
+def _pow2(x):
+    n = floor(x)
+    f = (x - n) * 0.6931471805599453    # ln(2)
+    term = 1.
+    total = 1.
+    for i in range(1, 20):
+        term *= f / i
+        total += term
+    return ldexp(total, int(n))
+
+
+def _in_sine(progress):
+    return -1.0 * _cos(progress * (pi / 2.0)) + 1.0
+
+
+def _out_sine(progress):
+    return _sin(progress * (pi / 2.0))
+
+
+def _in_out_sine(progress):
+    return -0.5 * (_cos(pi * progress) - 1.0)
+
+
+def _in_expo(progress):
+    if progress == 0:
+        return 0.0
+    return _pow2(10 * (progress - 1.0))
+
+
+def _out_expo(progress):
+    if progress == 1.0:
+        return 1.0
+    return -_pow2(-10 * progress) + 1.0
+
+
+def _in_out_expo(progress):
+    if progress == 0:
+        return 0.0
+    if progress == 1.:
+        return 1.0
+    p = progress * 2
+    if p < 1:
+        return 0.5 * _pow2(10 * (p - 1.0))
+    p -= 1.0
+    return 0.5 * (-_pow2(-10 * p) + 2.0)
+
+
+def _in_elastic(progress):
+    p = .3
+    s = p / 4.0
+    q = progress
+    if q == 1:
+        return 1.0
+    q -= 1.0
+    return -(_pow2(10 * q) * _sin((q - s) * (2 * pi) / p))
+
+
+def _out_elastic(progress):
+    p = .3
+    s = p / 4.0
+    q = progress
+    if q == 1:
+        return 1.0
+    return _pow2(-10 * q) * _sin((q - s) * (2 * pi) / p) + 1.0
+
+
+def _in_out_elastic(progress):
+    p = .3 * 1.5
+    s = p / 4.0
+    q = progress * 2
+    if q == 2:
+        return 1.0
+    if q < 1:
+        q -= 1.0
+        return -.5 * (_pow2(10 * q) * _sin((q - s) * (2.0 * pi) / p))
+    else:
+        q -= 1.0
+        return _pow2(-10 * q) * _sin((q - s) * (2.0 * pi) / p) * .5 + 1.0
+
+
+# keyed by both the Python and the compiled version of each transition
+_deterministic = dict()
+for _function in (_in_sine, _out_sine, _in_out_sine, _in_expo, _out_expo,
+                  _in_out_expo, _in_elastic, _out_elastic, _in_out_elastic):
+    _name = _function.__name__[1:]
+    _deterministic[getattr(AnimationTransition, _name)] = _function
+    _deterministic[get_transition(_name)] = _function
+
+
+def fixed_table(transition):
+    """ Get the integer lookup table of a registered transition
+
+    The table has TABLE_SIZE + 1 entries; entry i is the value of the
+    transition at progress i / TABLE_SIZE, scaled by ONE and rounded.
+    Tables are built once and shared.
+
+    The built in transitions are computed with IEEE 754 operations
+    that give the same result on every platform, so the tables are
+    identical everywhere.  Tables of custom transitions are only
+    identical if the function does not use sin, cos, pow or exp.
+
+    :param transition: name or callable of a registered transition
+    :returns: list of ints
+    :raises: ValueError
+    """
+    info = transition_info(transition)
+    if info is None:
+        raise ValueError
+
+    try:
+        return _tables[info.name]
+    except KeyError:
+        pass
+
+    function = _deterministic.get(info.function, info.function)
+    table = [int(floor(function(i / TABLE_SIZE) * ONE + .5))
+             for i in range(TABLE_SIZE + 1)]
+    _tables[info.name] = table
+    return table
+
+
+def table_checksum(*names):
+    """ Get a checksum of lookup tables
+
+    Peers in a lockstep game can compare checksums to be sure they
+    will compute the same values.
+
+    :param names: names of transitions
+    :returns: int
+    """
+    checksum = 0
+    for name in names:
+        data = ','.join(str(i) for i in fixed_table(name))
+        checksum = crc32(data.encode('ascii'), checksum)
+    return checksum & 0xffffffff
+
+
+class FixedAnimation(Animation):
+    """ Animation that only uses integer math
+
+    Floating point results and the math module can be different
+    across platforms and Python builds, which breaks lockstep games.
+    FixedAnimation uses integer lookup tables for the transitions and
+    integer interpolation, so the values are the same everywhere.
+
+        ani = FixedAnimation(unit, x=640, duration=500,
+                             transition='in_out_quad')
+
+        # time must be passed as integers, like milliseconds
+        ani.update(16)
+
+    The duration and the time passed to update must be whole numbers,
+    so a group that scales time by 1.0 works, and the initial and final
+    values must be integers.  ValueError is raised if they are not.
+    The transition must be registered.
+    """
+
+    def __init__(self, *targets, **kwargs):
+        transition = kwargs.get('transition', self.default_transition)
+        self._table = fixed_table(transition)
+        super(FixedAnimation, self).__init__(**kwargs)
+        duration = kwargs.get('duration', self.default_duration)
+        if int(duration) != duration or duration <= 0:
+            raise ValueError
+        self._duration = int(duration)
+        self._elapsed = 0
+        # Animation checked that _set_value is not replaced
+        if self._step is not None and self._duration < STEP_LIMIT:
+            self._step = _fixed_step
+        else:
+            self._step = None
+
+        if targets:
+            self.start(*targets)
+
+    def _gather_initial_values(self):
+        prime = super(FixedAnimation, self)._gather_initial_values()
+        for target, props in self._targets:
+            for a, b in props.values():
+                if not (isinstance(a, Integral) and isinstance(b, Integral)):
+                    raise ValueError
+                if abs(a) >= STEP_LIMIT or abs(b) >= STEP_LIMIT:
+                    self._step = None
+        return prime
+
+    def update(self, dt):
+        """ Update the animation
+
+        :param dt: Time passed since last update, as a whole number.
+        :raises: ValueError
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return
+
+        if int(dt) != dt:
+            raise ValueError
+        self._elapsed += int(dt)
+        if self._delay > 0:
+            if self._elapsed > self._delay:
+                self._elapsed -= self._delay
+                if self._gather_initial_values():
+                    self.update(0)
+                self._delay = 0
+            return
+
+        if self._step is not None:
+            p = self._step(self._targets, self._elapsed, self._duration,
+                           self._table, FIXED_BITS, STEP_BITS)
+        else:
+            if self._elapsed >= self._duration:
+                p = ONE
+                t = self._table[TABLE_SIZE]
+            else:
+                p = (self._elapsed << FIXED_BITS) // self._duration
+                i = p >> STEP_BITS
+                table = self._table
+                t = table[i] + (((table[i + 1] - table[i]) *
+                                 (p & STEP_MASK)) >> STEP_BITS)
+
+            for target, props in self._targets:
+                for name in props:
+                    a, b = props[name]
+                    self._set_value(target, name,
+                                    a + (((b - a) * t + HALF) >> FIXED_BITS))
+
+        if dt:
+            self._execute_callbacks("on update")
+
+        if p >= ONE:
+            self.finish()
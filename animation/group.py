@@ -0,0 +1,577 @@
+from __future__ import division
+from __future__ import print_function
+
+from collections import deque
+
+import pygame
+
+from .animation import AnimBase, Animation, Task, TaskSequence
+from .animation import ANIMATION_FINISHED
+from .columns import ColumnAnimation, flush_column_writes
+
+__all__ = ('AnimationGroup',)
+
+
+def _until_next_event(sprite):
+    method = getattr(sprite, 'time_until_next_event', None)
+    if method is None:
+        return None
+    return method()
+
+
+def _until_next_callback(sprite):
+    method = getattr(sprite, 'time_until_next_callback', None)
+    if method is None:
+        return _until_next_event(sprite)
+    return method()
+
+
+class AnimationGroup(pygame.sprite.Group):
+    """ Sprite group for Tasks and Animations with its own clock
+
+    AnimationGroup is a normal pygame group, but the time passed to
+    update can be scaled and the group can be paused.  This makes
+    slow-motion, pause menus and layers with different speeds
+    possible without changing the time passed to each Animation.
+
+        animations = AnimationGroup()
+        animations.add(Animation(sprite.rect, x=100))
+
+        animations.time_scale = .5   # slow motion
+        animations.pause()           # nothing is updated
+        animations.resume()
+
+    Groups can be nested by passing a parent.  The children are
+    updated by the parent with the time already scaled by the
+    parent, so the scales of nested groups are multiplied without
+    touching any of the contained Animations or Tasks.  Pausing a
+    parent will also pause the children.
+
+        world = AnimationGroup()
+        effects = AnimationGroup(parent=world, time_scale=2.)
+
+        # effects are updated by world at twice the world speed
+        world.update(dt)
+
+    Pass deferred=True to queue the callbacks of Tasks and Animations
+    in the group, instead of running them in the middle of the update.
+    Finishes, aborts and task intervals are appended to a completion
+    queue that is drained once after all members have been updated,
+    so callbacks never see a group that is half updated, and anything
+    they add to the group will be updated on the next tick.  'on update'
+    callbacks are not deferred.  Everything that finished during the
+    last update is available as a list in AnimationGroup.finished.
+
+        animations = AnimationGroup(deferred=True)
+        animations.update(dt)
+        for ani in animations.finished:
+            ...
+
+    ColumnAnimations in the group that share a column are written to
+    the column with one scatter write after the members were updated.
+
+    To limit the time spent in callbacks each frame, pass a
+    CallbackBudget as budget.  The group is then deferred, and the
+    queued callbacks are submitted to the budget, which is run after
+    each update.  Callbacks over the budget run on the next frames.
+
+        animations = AnimationGroup(budget=CallbackBudget(max_count=50))
+
+    Pass a callable as visible to set Animation.visible of every
+    Animation added to the group that does not have its own, so work is
+    skipped for targets that cannot be seen.  See ViewportCulling.
+
+    Members that do not need to be updated each frame, like background
+    ambience or slow fades, can be put in a lower update tier by
+    setting the tier attribute before adding them to the group.  A
+    member with tier 4 is updated once every 4 updates, and is passed
+    the time of those 4 updates.  The members of a tier are spread
+    evenly over the updates, so the work is the same each frame.
+
+        ani = Animation(cloud.rect, x=2000, duration=60000)
+        ani.tier = 4
+        animations.add(ani)
+
+    The group keeps an index of its members by tag, so whole sets of
+    members can be stopped without looking at the rest of the group.
+    The time this takes depends only on the number of tagged members.
+
+        animations.add(Animation(button.rect, y=0, tags='menu'))
+        animations.add(Task(spawn, 1000, -1, tags=('room 4', 'enemies')))
+
+        animations.finish_tagged('menu')
+        animations.abort_tagged('room 4')
+        animations.pause_tagged('enemies')
+        animations.resume_tagged('enemies')
+
+    Pygame groups and Animation.start are not thread-safe.  Threads
+    other than the one updating the group, like asset loaders or network
+    handlers, can submit starts, aborts and callbacks instead.  They are
+    appended to a queue that does not need a lock, and are applied in
+    one batch at the beginning of the next update, in the order they
+    were submitted.
+
+        # in a worker thread
+        animations.submit_start(Animation(x=100), sprite.rect)
+        animations.submit_abort(old_animation)
+        animations.submit(print, 'loaded')
+
+    Callbacks of members that are finished outside of update, for
+    example by calling Animation.finish, are executed on the next
+    update or when AnimationGroup.drain is called.
+
+    Like a normal animation group, it must not be drawn.
+    """
+
+    def __init__(self, *sprites, **kwargs):
+        self.time_scale = kwargs.get('time_scale', 1.)
+        self.finished = list()
+        self._paused = False
+        self._parent = None
+        self._children = list()
+        self._completion_queue = None
+        self._writes = dict()
+        self._frame = 0
+        self._tiers = dict()        # tier: (slots, accumulated time)
+        self._tiered = dict()       # member: [tier, slot, time owed]
+        self._submitted = deque()   # (func, args) from any thread
+        self._tagged = dict()       # tag: {member: None}
+        self._held = dict()         # members paused by pause_tagged
+        self._members = None        # list of members; None when changed
+        self.budget = kwargs.get('budget', None)
+        self.visible = kwargs.get('visible', None)
+        if kwargs.get('deferred', False) or self.budget is not None:
+            self._completion_queue = list()
+        super(AnimationGroup, self).__init__(*sprites)
+        self.parent = kwargs.get('parent', None)
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, parent):
+        """ Set the group that updates this group
+
+        :param parent: AnimationGroup or None
+        """
+        if self._parent is not None:
+            self._parent._children.remove(self)
+        self._parent = parent
+        if parent is not None:
+            parent._children.append(self)
+
+    @property
+    def children(self):
+        return list(self._children)
+
+    @property
+    def paused(self):
+        """ True if this group, or one of the parents, is paused
+        """
+        group = self
+        while group is not None:
+            if group._paused:
+                return True
+            group = group._parent
+        return False
+
+    @property
+    def effective_time_scale(self):
+        """ Time scale of this group multiplied by the scales of the parents
+        """
+        scale = self.time_scale
+        group = self._parent
+        while group is not None:
+            scale *= group.time_scale
+            group = group._parent
+        return scale
+
+    def add_internal(self, sprite, layer=None):
+        super(AnimationGroup, self).add_internal(sprite)
+        self._members = None
+        if self._completion_queue is not None and isinstance(sprite, AnimBase):
+            sprite._queue = self._completion_queue
+        if (self.visible is not None and isinstance(sprite, Animation) and
+                sprite.visible is None):
+            sprite.visible = self.visible
+        if isinstance(sprite, ColumnAnimation):
+            sprite._writes = self._writes
+        tier = getattr(sprite, 'tier', 1)
+        if tier > 1:
+            self._add_to_tier(sprite, tier)
+        for tag in getattr(sprite, 'tags', ()):
+            try:
+                self._tagged[tag][sprite] = None
+            except KeyError:
+                self._tagged[tag] = {sprite: None}
+
+    def remove_internal(self, sprite):
+        super(AnimationGroup, self).remove_internal(sprite)
+        self._members = None
+        if sprite in self._tiered:
+            tier, slot, owed = self._tiered.pop(sprite)
+            del self._tiers[tier][0][slot][sprite]
+        for tag in getattr(sprite, 'tags', ()):
+            members = self._tagged.get(tag)
+            if members is not None:
+                members.pop(sprite, None)
+                if not members:
+                    del self._tagged[tag]
+        self._held.pop(sprite, None)
+        if getattr(sprite, '_writes', None) is self._writes:
+            sprite._writes = None
+        # finished members are removed before their callbacks are queued
+        queue = self._completion_queue
+        if (queue is not None and getattr(sprite, '_queue', None) is queue and
+                sprite._state is not ANIMATION_FINISHED):
+            sprite._queue = None
+
+    def _current_members(self):
+        """ Get the members to update, without copying them each update
+
+        The list is only made again after members were added or removed,
+        and is never changed, so it is safe to iterate while members are
+        removed.  Like the copy made by pygame.sprite.Group.update,
+        members added during the update are not in it.
+
+        :returns: list
+        """
+        members = self._members
+        if members is None:
+            members = self._members = list(self.spritedict)
+        return members
+
+    def _add_to_tier(self, sprite, tier):
+        """ Put a member in the slot of the tier with the fewest members
+
+        :param sprite: Task or Animation
+        :param tier: update the member once every 'tier' updates
+        """
+        try:
+            slots, accumulated = self._tiers[tier]
+        except KeyError:
+            slots = [dict() for i in range(tier)]
+            accumulated = [0] * tier
+            self._tiers[tier] = slots, accumulated
+
+        slot = min(range(tier), key=lambda i: len(slots[i]))
+        slots[slot][sprite] = None
+        # time that passed in the slot before the member was added
+        self._tiered[sprite] = [tier, slot, accumulated[slot]]
+
+    def _update_tiers(self, dt):
+        """ Update one slot of each tier with the time it accumulated
+
+        :param dt: Time passed since last update.
+        """
+        frame = self._frame
+        self._frame += 1
+        tiered = self._tiered
+        # a member may add a new tier while the tiers are updated
+        for tier, (slots, accumulated) in list(self._tiers.items()):
+            for i in range(tier):
+                accumulated[i] += dt
+            slot = frame % tier
+            elapsed = accumulated[slot]
+            accumulated[slot] = 0
+            for sprite in list(slots[slot]):
+                entry = tiered.get(sprite)
+                if entry is None or sprite in self._held:
+                    continue    # removed by another member, or paused
+                owed = entry[2]
+                entry[2] = 0
+                sprite.update(elapsed - owed)
+
+    def submit(self, func, *args):
+        """ Call a function at the beginning of the next update
+
+        This is safe to call from any thread.
+
+        :param func: callable
+        :param args: arguments for func
+        :returns: None
+        """
+        # deque.append is atomic, so no lock is needed
+        self._submitted.append((func, args))
+
+    def submit_start(self, member, *targets):
+        """ Start a Task or Animation and add it at the next update
+
+        This is safe to call from any thread.  If targets are passed,
+        the member is started with them first.
+
+        :param member: Task or Animation
+        :param targets: targets for Animation.start
+        :returns: None
+        """
+        self._submitted.append((self._start_submitted, (member, targets)))
+
+    def submit_abort(self, member):
+        """ Abort a Task or Animation at the next update
+
+        This is safe to call from any thread.
+
+        :param member: Task or Animation
+        :returns: None
+        """
+        self._submitted.append((member.abort, ()))
+
+    def submit_schedule(self, member, func, when=None):
+        """ Schedule a callback of a Task or Animation at the next update
+
+        This is safe to call from any thread.
+
+        :param member: Task or Animation
+        :param func: callable
+        :param when: see AnimBase.schedule
+        :returns: None
+        """
+        self._submitted.append((member.schedule, (func, when)))
+
+    def _start_submitted(self, member, targets):
+        if targets:
+            member.start(*targets)
+        self.add(member)
+
+    def _run_submitted(self):
+        """ Apply everything that was submitted before this call
+
+        Anything submitted while this runs waits for the next update.
+        """
+        submitted = self._submitted
+        popleft = submitted.popleft
+        for i in range(len(submitted)):
+            func, args = popleft()
+            func(*args)
+
+    def tagged(self, tag):
+        """ Get the members that have a tag
+
+        :param tag: any hashable
+        :returns: list
+        """
+        return list(self._tagged.get(tag, ()))
+
+    def abort_tagged(self, tag):
+        """ Abort all members that have a tag
+
+        :param tag: any hashable
+        :returns: list of the members that were aborted
+        """
+        members = self.tagged(tag)
+        for member in members:
+            member.abort()
+        return members
+
+    def finish_tagged(self, tag, apply_values=True):
+        """ Finish all members that have a tag
+
+        If apply_values is False, Animations are stopped where they are
+        instead of jumping to the final values; their 'on finish'
+        callbacks are still executed.  Tasks are always finished.
+
+        :param tag: any hashable
+        :param apply_values: set the final values of the Animations
+        :returns: list of the members that were finished
+        """
+        members = self.tagged(tag)
+        for member in members:
+            if apply_values or isinstance(member, (Task, TaskSequence)):
+                member.finish()
+            else:
+                member.abort()
+        # finished Tasks stay in their groups until they are removed
+        self.remove(*members)
+        return members
+
+    def pause_tagged(self, tag):
+        """ Stop updating the members that have a tag
+
+        Paused members stay in the group, and do not get the time that
+        passes while they are paused.
+
+        :param tag: any hashable
+        :returns: list of the members that were paused
+        """
+        members = self.tagged(tag)
+        for member in members:
+            self._held[member] = None
+        return members
+
+    def resume_tagged(self, tag):
+        """ Continue updating the members that have a tag
+
+        :param tag: any hashable
+        :returns: list of the members that were resumed
+        """
+        members = self.tagged(tag)
+        held = self._held
+        for member in members:
+            if member not in held:
+                continue
+            del held[member]
+            entry = self._tiered.get(member)
+            if entry is not None:
+                # time that passed in the slot while the member was paused
+                tier, slot, owed = entry
+                entry[2] = self._tiers[tier][1][slot]
+        return members
+
+    def drain(self):
+        """ Execute all queued callbacks
+
+        Callbacks are executed in the order they were queued.  Members
+        that are finished by a callback are drained too.  This is called
+        automatically after each update, but can be used to flush the
+        queue at other times.
+
+        If the group has a budget, the callbacks are submitted to it
+        instead of being executed.
+
+        :returns: None
+        """
+        queue = self._completion_queue
+        if queue is None:
+            return
+
+        budget = self.budget
+        if budget is not None:
+            for member, when in queue:
+                if when == 'on finish':
+                    self.finished.append(member)
+                for callback in member._callbacks.get(when, ()):
+                    budget.submit(callback, member.priority)
+            del queue[:]
+            return
+
+        while queue:
+            batch = list(queue)
+            del queue[:]
+            for member, when in batch:
+                if when == 'on finish':
+                    self.finished.append(member)
+                member._run_callbacks(when)
+
+    def time_until_next_event(self):
+        """ Get the time until something in the group needs to be updated
+
+        Use this to sleep, or lower the tick rate, when nothing is due.
+        The time is in the units passed to update, so the time scale
+        of the group and the child groups is accounted for.  Members
+        that do not have a time_until_next_event method are ignored.
+        Submitted functions and callbacks waiting in the queue or the
+        budget are due on the next update, so the time is 0 if there
+        are any.
+
+            wait = animations.time_until_next_event()
+            if wait is None:
+                pass            # nothing is scheduled
+            elif wait > 0:
+                sleep(wait)     # nothing will change for 'wait' time
+
+        :returns: time, or None if nothing is scheduled
+        """
+        return self._time_until(_until_next_event)
+
+    def time_until_next_callback(self):
+        """ Get the time until a member of the group will finish or fire
+
+        Unlike time_until_next_event, running Animations are not due
+        on every update; they are due when they finish.  Members that
+        do not have a time_until_next_callback method use
+        time_until_next_event, so members that change each update
+        without knowing when they finish, like StreamTracks, are always
+        due.  This is used by VirtualClock to jump from one callback to
+        the next.
+
+        :returns: time, or None if nothing is scheduled
+        """
+        return self._time_until(_until_next_callback)
+
+    def _has_pending(self):
+        """ Check for work that the next update will do in any case
+
+        Submitted functions, queued callbacks, and callbacks left in
+        the budget are run by the next update, even if no member is due.
+
+        :returns: bool
+        """
+        return bool(self._submitted or self._completion_queue or
+                    (self.budget is not None and len(self.budget)))
+
+    def _time_until(self, wait_of):
+        """ Get the soonest time of the members and the child groups
+
+        :param wait_of: callable that returns the time of a member
+        :returns: time, or None if nothing is scheduled
+        """
+        if self._paused:
+            return None
+        if self._has_pending():
+            return 0
+        if not self.time_scale:
+            return None
+
+        soonest = None
+        for sprite in self._current_members():
+            if sprite in self._held:
+                continue
+            wait = wait_of(sprite)
+            if wait is not None and (soonest is None or wait < soonest):
+                soonest = wait
+                if not wait:
+                    return 0
+
+        for child in self._children:
+            wait = child._time_until(wait_of)
+            if wait is not None and (soonest is None or wait < soonest):
+                soonest = wait
+
+        if soonest is None:
+            return None
+        return soonest / self.time_scale
+
+    def pause(self):
+        """ Stop updating the group and all of the children
+
+        A paused group does not do any work when updated.
+        """
+        self._paused = True
+
+    def resume(self):
+        """ Continue updating the group after it was paused
+        """
+        self._paused = False
+
+    def update(self, dt):
+        """ Update all Tasks and Animations, then the child groups
+
+        :param dt: Time passed since last update.
+        """
+        if self._paused:
+            return
+
+        if self._submitted:
+            self._run_submitted()
+        dt *= self.time_scale
+        if self._completion_queue is not None:
+            del self.finished[:]
+        if self._tiered or self._held:
+            tiered = self._tiered
+            held = self._held
+            for sprite in self._current_members():
+                if sprite not in tiered and sprite not in held:
+                    sprite.update(dt)
+            if tiered:
+                self._update_tiers(dt)
+        else:
+            for sprite in self._current_members():
+                sprite.update(dt)
+        for child in self._children:
+            child.update(dt)
+        if self._writes:
+            flush_column_writes(self._writes)
+        self.drain()
+        if self.budget is not None:
+            self.budget.run()
@@ -0,0 +1,254 @@
+from __future__ import division
+from __future__ import print_function
+
+from bisect import bisect_left, bisect_right
+
+import pygame
+
+from .animation import Animation, is_number
+from .animation import ANIMATION_RUNNING
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ('InstancedAnimation',)
+
+
+class InstancedAnimation(Animation):
+    """ One Animation definition that drives many targets
+
+    An Animation with many targets keeps a dict of values for each
+    target and computes the transition for each of them.  For crowds,
+    InstancedAnimation stores the values of all targets in one array
+    for each attribute, computes the transition once, and interpolates
+    all of the values at once.
+
+        ani = InstancedAnimation(*[s.rect for s in crowd], y=0,
+                                 duration=500, transition='out_bounce')
+
+    Instances can be staggered, so each one starts a bit later than
+    the one before.  There is no need for a delayed Animation for each
+    target; the start time of each instance is only an offset:
+
+        # each instance starts 20 after the one before it
+        ani = InstancedAnimation(*targets, y=0, stagger=20)
+
+        # or, any offset for each target
+        ani = InstancedAnimation(*targets, y=0, offsets=[0, 50, 10])
+
+    The transition is computed once for the instances that are moving;
+    instances that have not started or are done share one value.
+    Instances are at their initial values until their offset has passed.
+    The animation finishes when the last instance is done.
+
+    All other keywords work like they do for Animation, except that
+    culling with 'visible' is not supported.  NumPy is used if it is
+    installed, but it is not required.
+    """
+
+    def __init__(self, *targets, **kwargs):
+        self._offsets = kwargs.pop('offsets', None)
+        self._stagger = kwargs.pop('stagger', 0)
+        super(InstancedAnimation, self).__init__(**kwargs)
+        self._step = None
+        self._channels = None
+        self._times = list()
+        self._inverse = None
+        self._end = 0.
+
+        if targets:
+            self.start(*targets)
+
+    @property
+    def targets(self):
+        if self._channels is None:
+            return list()
+        return [(target, dict((name, (initial[i], final[i]))
+                              for name, initial, final, _ in self._channels))
+                for i, target in enumerate(self._targets)]
+
+    def _gather_initial_values(self):
+        """ Read initial values of every target into one array per attribute
+
+        :returns: bool, True if the values need to be 'primed'
+        """
+        targets = list(self._pre_targets)
+        count = len(targets)
+        initial = self._initial
+        for value in self.props.values():
+            is_number(value)
+
+        if self._offsets is None:
+            offsets = [i * self._stagger for i in range(count)]
+        else:
+            offsets = list(self._offsets)
+            if len(offsets) != count:
+                raise ValueError
+        for offset in offsets:
+            is_number(offset)
+            if offset < 0:
+                raise ValueError
+
+        for target in targets:
+            if isinstance(target, pygame.Rect):
+                self._round_values = True
+        prime = (initial is not None or self._round_values or
+                 self._transition(0.) != 0.)
+
+        channels = list()
+        for name, value in self.props.items():
+            starts = list()
+            setter = False
+            for target in targets:
+                attr = getattr(target, name)
+                if callable(attr):
+                    setter = True
+                if initial is not None:
+                    start = self._get_value(target, name)
+                elif callable(attr):
+                    start = attr()
+                else:
+                    start = attr
+                is_number(start)
+                starts.append(start)
+            if self._relative:
+                ends = [value + i for i in starts]
+            else:
+                ends = [value] * count
+            if numpy is not None:
+                starts = numpy.array(starts, dtype=float)
+                ends = numpy.array(ends, dtype=float)
+            channels.append((name, starts, ends, setter))
+            prime = prime or setter
+
+        # instances that share an offset share the transformed progress
+        times = sorted(set(offsets))
+        index = dict((time, i) for i, time in enumerate(times))
+        inverse = [index[i] for i in offsets]
+        if numpy is not None:
+            inverse = numpy.array(inverse, dtype=numpy.intp)
+
+        self._targets = targets
+        self._channels = channels
+        self._times = times
+        self._inverse = inverse
+        self._end = self._duration + (times[-1] if times else 0)
+        return prime
+
+    def _progress(self):
+        """ Get the transformed progress of every instance
+
+        :returns: float if all instances share it, otherwise a sequence
+        """
+        elapsed = self._elapsed
+        duration = self._duration
+        transition = self._transition
+        times = self._times
+        if len(times) == 1:
+            return transition(min(1., max(0., (elapsed - times[0]) / duration)))
+
+        # times are sorted, so the instances that are done come first,
+        # then the moving ones, then the ones that have not started
+        done = bisect_right(times, elapsed - duration)
+        waiting = bisect_left(times, elapsed)
+        values = [transition(1.)] * done
+        values.extend(transition((elapsed - i) / duration)
+                      for i in times[done:waiting])
+        values.extend([transition(0.)] * (len(times) - waiting))
+
+        inverse = self._inverse
+        if numpy is not None:
+            return numpy.array(values)[inverse]
+        return [values[i] for i in inverse]
+
+    def _apply(self, t):
+        """ Interpolate and set the values of all instances
+
+        :param t: transformed progress, a float or one for each instance
+        :returns: None
+        """
+        targets = self._targets
+        round_values = self._round_values
+        for name, starts, ends, setter in self._channels:
+            if numpy is not None:
+                values = starts * (1. - t) + ends * t
+                if round_values:
+                    values = numpy.rint(values).astype(int)
+                values = values.tolist()
+            else:
+                if isinstance(t, list):
+                    values = [a * (1. - i) + b * i
+                              for a, b, i in zip(starts, ends, t)]
+                else:
+                    s = 1. - t
+                    values = [a * s + b * t for a, b in zip(starts, ends)]
+                if round_values:
+                    values = [int(round(i, 0)) for i in values]
+
+            if setter:
+                for target, value in zip(targets, values):
+                    attr = getattr(target, name)
+                    if callable(attr):
+                        attr(value)
+                    else:
+                        setattr(target, name, value)
+            else:
+                for target, value in zip(targets, values):
+                    setattr(target, name, value)
+
+    def time_until_next_callback(self):
+        """ Get the time until the delay is over, or the last instance finishes
+
+        :returns: time, or None if the animation is not running
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return None
+        if self._delay > 0:
+            return max(0, self._delay - self._elapsed)
+        return max(0, self._end - self._elapsed)
+
+    def update(self, dt):
+        """ Update the animation
+
+        :param dt: Time passed since last update.
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return
+
+        self._elapsed += dt
+        if self._delay > 0:
+            if self._elapsed > self._delay:
+                self._elapsed -= self._delay
+                if self._gather_initial_values():
+                    self.update(0)
+                self._delay = 0
+            return
+
+        self._apply(self._progress())
+
+        if dt:
+            self._execute_callbacks("on update")
+
+        if self._elapsed >= self._end:
+            self.finish()
+
+    def finish(self):
+        """ Force all instances to finish, apply final values, and execute callbacks
+
+        :returns: None
+        """
+        if self._channels is not None:
+            self._apply(1.)
+
+        self._execute_callbacks("on update")
+        self.abort()
+
+    def abort(self):
+        """ Force animation to finish, without changing the values
+
+        :returns: None
+        """
+        self._channels = None
+        super(InstancedAnimation, self).abort()
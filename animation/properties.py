@@ -0,0 +1,193 @@
+from __future__ import division
+from __future__ import print_function
+
+from .animation import Animation
+from .animation import ANIMATION_RUNNING
+
+__all__ = ('AnimatedProperty', 'LazyAnimation')
+
+
+class AnimatedProperty(object):
+    """ Attribute that is computed only when it is read
+
+    An Animation sets the values of the targets on every update, even
+    if nothing reads them, like the alpha of a hidden widget or the
+    position of a sprite that is only checked for collisions.  Declare
+    the attribute as an AnimatedProperty and animate it with a
+    LazyAnimation, and the value is only computed when it is read:
+
+        class Widget(object):
+            alpha = AnimatedProperty(255)
+
+        widget = Widget()
+        animations.add(LazyAnimation(widget, alpha=0, duration=500))
+
+        # computed here, at the time of the LazyAnimation
+        widget.alpha
+
+    Outside of animations, it works like a normal attribute.  Setting
+    the attribute stops any LazyAnimation from changing it.  The value
+    is stored in the __dict__ of the instance, so classes that use
+    __slots__ are not supported.
+    """
+
+    def __init__(self, default=0.):
+        self.default = default
+        self._key = '_animated_%x' % id(self)
+        self._binding = self._key + '_animation'
+
+    def __set_name__(self, owner, name):
+        self._key = '_animated_' + name
+        self._binding = self._key + '_animation'
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        d = instance.__dict__
+        binding = d.get(self._binding)
+        if binding is not None:
+            animation, a, b = binding
+            return animation._value_between(a, b)
+        return d.get(self._key, self.default)
+
+    def __set__(self, instance, value):
+        d = instance.__dict__
+        d.pop(self._binding, None)
+        d[self._key] = value
+
+    def _bind(self, instance, animation, a, b):
+        """ Make a LazyAnimation compute the value of the property
+
+        :param instance: object that has the property
+        :param animation: LazyAnimation
+        :param a: initial value
+        :param b: final value
+        """
+        instance.__dict__[self._binding] = animation, a, b
+
+    def _release(self, instance, animation):
+        """ Store the value computed by an animation, if it is still bound
+
+        :param instance: object that has the property
+        :param animation: LazyAnimation
+        :returns: None
+        """
+        d = instance.__dict__
+        binding = d.get(self._binding)
+        if binding is not None and binding[0] is animation:
+            d[self._key] = self.__get__(instance)
+            del d[self._binding]
+
+
+class LazyAnimation(Animation):
+    """ Animation of AnimatedProperty attributes that computes nothing on update
+
+    Updating a LazyAnimation only advances its time.  The value of an
+    attribute is computed from the time of the animation when the
+    attribute is read, so attributes that are not read cost nothing.
+
+        class Ship(object):
+            x = AnimatedProperty()
+            y = AnimatedProperty()
+
+        ani = LazyAnimation(ship, x=100, y=50, duration=1000)
+
+    Every attribute must be an AnimatedProperty, or ValueError is
+    raised.  All keywords work like they do for Animation.
+
+    'on update' callbacks are executed after each update, like any
+    Animation; the attributes can be read in the callback.  When the
+    animation finishes, the final values are stored and 'on finish'
+    callbacks are executed.  If it is aborted, the attributes keep the
+    value they have at that time.
+
+    Starting another LazyAnimation on an attribute, or setting it,
+    takes it over from the animation that was changing it.  The
+    animation will still finish and execute its callbacks, but does
+    not change the attribute anymore.
+    """
+
+    def __init__(self, *targets, **kwargs):
+        super(LazyAnimation, self).__init__(**kwargs)
+        self._step = None
+        if targets:
+            self.start(*targets)
+
+    def _value_between(self, a, b):
+        """ Get the value between a and b at the time of the animation
+
+        :param a: initial value
+        :param b: final value
+        :returns: number
+        """
+        t = self._transition(min(1., self._elapsed / self._duration))
+        value = (a * (1. - t)) + (b * t)
+        if self._round_values:
+            value = int(round(value, 0))
+        return value
+
+    def _properties(self):
+        """ Get the targets, names and descriptors of the attributes
+
+        :returns: generator of (target, name, AnimatedProperty)
+        """
+        for target, props in self._targets or ():
+            owner = type(target)
+            for name in props:
+                yield target, name, getattr(owner, name, None)
+
+    def _gather_initial_values(self):
+        super(LazyAnimation, self)._gather_initial_values()
+        for target, name, descriptor in self._properties():
+            if not isinstance(descriptor, AnimatedProperty):
+                raise ValueError
+
+        for target, props in self._targets:
+            owner = type(target)
+            for name, (a, b) in props.items():
+                getattr(owner, name)._bind(target, self, a, b)
+
+        # values are computed when read, so there is nothing to prime
+        return False
+
+    def update(self, dt):
+        """ Advance the time of the animation
+
+        :param dt: Time passed since last update.
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return
+
+        self._elapsed += dt
+        if self._delay > 0:
+            if self._elapsed > self._delay:
+                self._elapsed -= self._delay
+                self._gather_initial_values()
+                self._delay = 0
+            return
+
+        if dt:
+            self._execute_callbacks("on update")
+
+        if self._elapsed >= self._duration:
+            self.finish()
+
+    def finish(self):
+        """ Force animation to finish, store final values, and execute callbacks
+
+        :returns: None
+        """
+        self._elapsed = self._duration
+        self._delay = 0
+        self._execute_callbacks("on update")
+        self.abort()
+
+    def abort(self):
+        """ Force animation to finish, and keep the values it has now
+
+        :returns: None
+        """
+        for target, name, descriptor in self._properties():
+            descriptor._release(target, self)
+        super(LazyAnimation, self).abort()
@@ -0,0 +1,361 @@
+from __future__ import division
+from __future__ import print_function
+
+from array import array
+from math import ceil
+
+import pygame
+
+from .animation import AnimBase, is_number
+from .animation import ANIMATION_RUNNING, ANIMATION_FINISHED
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ('Spring', 'Springs')
+
+# names of the arrays that hold the state of every spring
+FIELDS = ('position', 'velocity', 'goal', 'stiffness', 'damping')
+
+
+def _make_array(size):
+    if numpy is not None:
+        return numpy.zeros(size)
+    return array('d', [0.]) * size
+
+
+class Spring(AnimBase):
+    """ One spring of Springs
+
+    Made by Springs.add; do not make it directly.  The spring is
+    finished when it has settled at the goal, or when it is aborted.
+    Schedule a callback to know when it settles:
+
+        spring = springs.add(sprite.rect, 'x', 300)
+        spring.schedule(on_settled)
+
+    :ivar target: object that is changed, or None
+    :ivar name: name of the attribute that is changed
+    :ivar index: index of the state in the arrays of Springs, or None
+                 if the spring is finished
+    """
+    _valid_schedules = ('on finish',)
+
+    def __init__(self, springs, target, name, round_values):
+        super(Spring, self).__init__()
+        self.target = target
+        self.name = name
+        self.index = None
+        self._springs = springs
+        self._round_values = round_values
+        self._value = 0.
+        self._state = ANIMATION_RUNNING
+
+    @property
+    def position(self):
+        if self.index is None:
+            return self._value
+        return self._springs.position[self.index]
+
+    @property
+    def velocity(self):
+        if self.index is None:
+            return 0.
+        return self._springs.velocity[self.index]
+
+    @property
+    def goal(self):
+        if self.index is None:
+            return self._value
+        return self._springs.goal[self.index]
+
+    def retarget(self, goal):
+        """ Change the goal, keeping the position and velocity
+
+        This only changes one number in the arrays.  If the spring
+        was finished, it is started again from where it stopped.
+
+        :param goal: number
+        :returns: None
+        """
+        is_number(goal)
+        if self.index is None:
+            self._springs._revive(self)
+        self._springs.goal[self.index] = goal
+
+    def finish(self):
+        """ Jump to the goal and finish
+        """
+        if self.index is not None:
+            self._springs._retire(self.index, True)
+
+    def abort(self):
+        """ Stop where it is and finish
+        """
+        if self.index is not None:
+            self._springs._retire(self.index, False)
+
+
+class Springs(AnimBase):
+    """ Springs that move values with physics instead of a duration
+
+    A spring pulls a value to its goal, and keeps its velocity if the
+    goal is changed, so motion can be interrupted and still be smooth.
+    The motion is set with stiffness, damping and mass, instead of a
+    duration and a transition.
+
+    The position, velocity and goal of every spring are kept in
+    arrays, and all springs are moved together each update.  Add the
+    Springs to a group once, then add springs to it:
+
+        springs = Springs()
+        animations.add(springs)
+
+        spring = springs.add(sprite.rect, 'x', 300, stiffness=170,
+                             damping=26)
+        spring.retarget(500)    # cheap; does not allocate
+
+    If target is None, nothing is changed, and the value can be read
+    from spring.position or the position array.
+
+    A spring is finished when the distance to the goal and the velocity
+    are both below epsilon.  The value is set to the goal, its 'on
+    finish' callbacks are executed, and the slot in the arrays is used
+    again by the next spring that is added.  The arrays are only made
+    bigger when there are more springs than capacity.
+
+    The springs use implicit Euler integration, which is stable for
+    any stiffness and time step.  Long updates are split into steps of
+    at most max_step.  Stiffness and damping are per second, and unit
+    is the length of the unit of time passed to update in seconds; the
+    default is milliseconds.  Values are rounded like Animation does,
+    which is automatic for pygame Rects.
+
+    If NumPy is installed, the arrays are NumPy arrays, and the springs
+    are moved with array operations.  Otherwise the arrays are arrays
+    from the array module.
+
+    :ivar position: array of the position of each slot
+    :ivar velocity: array of the velocity of each slot
+    :ivar goal: array of the goal of each slot
+    """
+    _valid_schedules = ('on update',)
+
+    def __init__(self, capacity=64, epsilon=.01, unit=.001, max_step=1 / 120.):
+        super(Springs, self).__init__()
+        self.epsilon = epsilon
+        self.unit = unit
+        self.max_step = max_step
+        self._springs = dict()      # index: Spring
+        self._free = list()
+        self._size = 0              # slots in use or freed
+        self._capacity = 0
+        self._state = ANIMATION_RUNNING
+        self._allocate(capacity)
+
+    def __len__(self):
+        return len(self._springs)
+
+    def _allocate(self, capacity):
+        """ Make the arrays bigger, keeping the state of the springs
+
+        :param capacity: new number of slots
+        """
+        for name in FIELDS:
+            new = _make_array(capacity)
+            if self._capacity:
+                new[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, new)
+        self._capacity = capacity
+
+    def add(self, target, name, goal, stiffness=170., damping=26., mass=1.,
+            value=None, velocity=0., round_values=False):
+        """ Add a spring
+
+        :param target: object to change, or None
+        :param name: name of the attribute to change
+        :param goal: value the spring pulls to
+        :param stiffness: force per distance from the goal
+        :param damping: force per velocity
+        :param mass: mass of the spring
+        :param value: initial value; if None, the value of the attribute
+        :param velocity: initial velocity
+        :param round_values: round the values set on the target
+        :returns: Spring
+        """
+        is_number(goal)
+        if mass <= 0 or stiffness < 0 or damping < 0:
+            raise ValueError
+        if value is None:
+            value = getattr(target, name) if target is not None else goal
+            if callable(value):
+                value = value()
+        is_number(value)
+
+        if isinstance(target, pygame.Rect):
+            round_values = True
+        spring = Spring(self, target, name, round_values)
+        index = self._take_slot(spring)
+        self.position[index] = value
+        self.velocity[index] = velocity
+        self.goal[index] = goal
+        # stored divided by the mass, which is all the integrator needs
+        self.stiffness[index] = stiffness / mass
+        self.damping[index] = damping / mass
+        return spring
+
+    def _take_slot(self, spring):
+        """ Find a free slot for a spring, making the arrays bigger if needed
+
+        :param spring: Spring
+        :returns: index of the slot
+        """
+        if self._free:
+            index = self._free.pop()
+        else:
+            if self._size == self._capacity:
+                self._allocate(max(1, self._capacity * 2))
+            index = self._size
+            self._size += 1
+        spring.index = index
+        self._springs[index] = spring
+        return index
+
+    def _revive(self, spring):
+        """ Give a finished spring a slot again
+
+        :param spring: Spring
+        """
+        stiffness = spring._stiffness
+        damping = spring._damping
+        index = self._take_slot(spring)
+        self.position[index] = spring._value
+        self.velocity[index] = 0.
+        self.goal[index] = spring._value
+        self.stiffness[index] = stiffness
+        self.damping[index] = damping
+        spring._state = ANIMATION_RUNNING
+
+    def _retire(self, index, settle):
+        """ Finish a spring and free its slot
+
+        :param index: slot of the spring
+        :param settle: if True, jump to the goal first
+        """
+        spring = self._springs.pop(index)
+        if settle:
+            self.position[index] = self.goal[index]
+        value = spring._value = self.position[index]
+        spring._stiffness = self.stiffness[index]
+        spring._damping = self.damping[index]
+        if spring.target is not None:
+            spring._set_value(spring.target, spring.name, value)
+
+        # a free slot is at rest, so integrating it changes nothing
+        self.position[index] = self.velocity[index] = self.goal[index] = 0.
+        self._free.append(index)
+        spring.index = None
+        spring._state = ANIMATION_FINISHED
+        spring._queue = self._queue
+        spring._execute_callbacks('on finish')
+
+    def _integrate(self, h):
+        """ Move every spring by one step with implicit Euler
+
+        :param h: time step, in seconds
+        """
+        size = self._size
+        if numpy is not None:
+            x = self.position[:size]
+            v = self.velocity[:size]
+            k = self.stiffness[:size]
+            v -= h * k * (x - self.goal[:size])
+            v /= 1. + h * self.damping[:size] + h * h * k
+            x += h * v
+            return
+
+        x = self.position
+        v = self.velocity
+        g = self.goal
+        k = self.stiffness
+        c = self.damping
+        for i in self._springs:
+            ki = k[i]
+            vi = (v[i] - h * ki * (x[i] - g[i])) / (1. + h * c[i] + h * h * ki)
+            v[i] = vi
+            x[i] += h * vi
+
+    def _settled(self):
+        """ Get the slots of springs that are at rest at the goal
+
+        :returns: list of indices
+        """
+        epsilon = self.epsilon
+        if numpy is not None:
+            size = self._size
+            near = ((numpy.abs(self.position[:size] - self.goal[:size]) <
+                     epsilon) &
+                    (numpy.abs(self.velocity[:size]) < epsilon))
+            return [i for i in numpy.flatnonzero(near).tolist()
+                    if i in self._springs]
+
+        x = self.position
+        v = self.velocity
+        g = self.goal
+        return [i for i in self._springs
+                if abs(x[i] - g[i]) < epsilon and abs(v[i]) < epsilon]
+
+    def update(self, dt):
+        """ Move all springs, set the values, and finish settled springs
+
+        :param dt: Time passed since last update.
+        """
+        if self._state is not ANIMATION_RUNNING or not self._springs:
+            return
+
+        h = dt * self.unit
+        if h > 0:
+            steps = int(ceil(h / self.max_step))
+            h /= steps
+            for i in range(steps):
+                self._integrate(h)
+
+        for index in self._settled():
+            self._retire(index, True)
+
+        position = self.position
+        if numpy is not None:
+            position = position[:self._size].tolist()
+        for index, spring in self._springs.items():
+            if spring.target is not None:
+                spring._set_value(spring.target, spring.name, position[index])
+
+        if dt:
+            self._execute_callbacks("on update")
+
+    def time_until_next_event(self):
+        """ Moving springs change values each update
+
+        :returns: 0, or None if no spring is moving
+        """
+        if self._state is not ANIMATION_RUNNING or not self._springs:
+            return None
+        return 0
+
+    def finish(self):
+        """ Jump every spring to its goal and finish them
+
+        The Springs stay in the group, so more can be added.
+        """
+        for index in list(self._springs):
+            self._retire(index, True)
+
+    def abort(self):
+        """ Stop every spring where it is, and remove the Springs from groups
+        """
+        for index in list(self._springs):
+            self._retire(index, False)
+        self._state = ANIMATION_FINISHED
+        self.kill()
@@ -0,0 +1,237 @@
+from __future__ import division
+from __future__ import print_function
+
+import json
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from threading import current_thread
+from timeit import default_timer
+
+from .animation import AnimBase, Animation, Task
+from .budget import CallbackBudget
+from .group import AnimationGroup
+
+__all__ = ('TraceRecorder',)
+
+# methods that are timed, as (class, name)
+HOOKS = (
+    (Animation, 'start'),
+    (Animation, 'update'),
+    (Animation, 'finish'),
+    (Animation, 'abort'),
+    (Task, 'update'),
+    (Task, 'finish'),
+    (AnimBase, '_run_callbacks'),
+    (AnimationGroup, 'update'),
+    (AnimationGroup, 'drain'),
+    (CallbackBudget, 'submit'),
+)
+
+_active = None
+
+
+class TraceRecorder(object):
+    """ Record a timeline of Animations and Tasks for a trace viewer
+
+    The recorder times the methods in HOOKS while it is enabled, and
+    keeps the newest events in a ring buffer of a fixed size.  The
+    events can be saved as Chrome Trace Event JSON, which can be opened
+    in chrome://tracing or Perfetto to find what caused a frame hitch.
+
+        recorder = TraceRecorder(capacity=100000)
+        recorder.enable()
+        ...
+        with open('trace.json', 'w') as fp:
+            recorder.export(fp)
+
+    The methods are only wrapped while the recorder is enabled, so
+    there is no cost at all when it is disabled.  When enabled, each
+    event is a small tuple, and the oldest events are dropped when
+    the buffer is full, so memory is bounded.  Only one recorder can
+    be enabled at a time.  Subclasses that replace a hooked method,
+    like FixedAnimation.update, are not timed.
+
+    Callbacks are recorded when they are executed, so the callbacks of
+    a deferred group are inside AnimationGroup.drain, and callbacks
+    submitted to a CallbackBudget are recorded one by one, as
+    'CallbackBudget' and the name of the function, when the budget runs
+    them.  Callbacks are only recorded if there are callbacks to
+    execute.  Your own code can be added to the timeline with span:
+
+        with recorder.span('physics'):
+            step_physics()
+
+    Times are measured with clock, in seconds.
+
+    :ivar dropped: number of events that were dropped because the
+                   buffer was full
+    """
+
+    def __init__(self, capacity=65536, clock=default_timer):
+        self.capacity = capacity
+        self.dropped = 0
+        self._clock = clock
+        self._events = deque(maxlen=capacity)
+        self._originals = list()
+
+    def __len__(self):
+        return len(self._events)
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *args):
+        self.disable()
+
+    @property
+    def enabled(self):
+        return _active is self
+
+    def enable(self):
+        """ Start recording
+
+        :raises: RuntimeError if another recorder is enabled
+        """
+        global _active
+        if _active is self:
+            return
+        if _active is not None:
+            raise RuntimeError
+        _active = self
+        for owner, name in HOOKS:
+            original = owner.__dict__[name]
+            self._originals.append((owner, name, original))
+            setattr(owner, name, self._wrap(original, name))
+
+    def disable(self):
+        """ Stop recording, and remove the hooks
+
+        The events are kept until clear is called.
+        """
+        global _active
+        if _active is not self:
+            return
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        del self._originals[:]
+        _active = None
+
+    def clear(self):
+        """ Remove all recorded events
+        """
+        self._events.clear()
+        self.dropped = 0
+
+    def _append(self, event):
+        events = self._events
+        if len(events) == self.capacity:
+            self.dropped += 1
+        events.append(event)
+
+    def _wrap(self, original, name):
+        """ Make a version of a method that records an event
+
+        Events are (start, duration, category, class, name, id, thread).
+        Only the class and id of the member are kept, so the recorder
+        does not keep finished members alive.
+        """
+        clock = self._clock
+        append = self._append
+
+        if name == '_run_callbacks':
+            @wraps(original)
+            def hook(member, when):
+                if not member._callbacks.get(when):
+                    return original(member, when)
+                start = clock()
+                try:
+                    return original(member, when)
+                finally:
+                    append((start, clock() - start, 'callback', type(member),
+                            when, id(member), current_thread().ident))
+            return hook
+
+        if name == 'submit':
+            @wraps(original)
+            def hook(budget, func, *args):
+                return original(budget, self._wrap_callback(budget, func),
+                                *args)
+            return hook
+
+        @wraps(original)
+        def hook(member, *args):
+            start = clock()
+            try:
+                return original(member, *args)
+            finally:
+                append((start, clock() - start, 'animation', type(member),
+                        name, id(member), current_thread().ident))
+        return hook
+
+    def _wrap_callback(self, budget, func):
+        """ Make a callback for a CallbackBudget that records an event
+
+        Callbacks that run after the recorder is disabled are not
+        recorded.
+        """
+        clock = self._clock
+        append = self._append
+        name = getattr(func, '__name__', type(func).__name__)
+
+        def callback():
+            if _active is not self:
+                return func()
+            start = clock()
+            try:
+                return func()
+            finally:
+                append((start, clock() - start, 'callback', CallbackBudget,
+                        name, id(budget), current_thread().ident))
+        return callback
+
+    @contextmanager
+    def span(self, name):
+        """ Record the time of a block of your own code
+
+        :param name: name shown in the timeline
+        """
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self._append((start, self._clock() - start, 'user', None, name,
+                          None, current_thread().ident))
+
+    def events(self):
+        """ Get the recorded events as Chrome Trace Events
+
+        :returns: list of dicts
+        """
+        events = list()
+        for start, duration, category, cls, name, ident, thread in self._events:
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': start * 1e6,
+                'dur': duration * 1e6,
+                'pid': 0,
+                'tid': thread,
+            }
+            if cls is not None:
+                separator = ' ' if category == 'callback' else '.'
+                event['name'] = cls.__name__ + separator + name
+                event['args'] = {'id': ident}
+            events.append(event)
+        return events
+
+    def export(self, fp):
+        """ Write the events as Chrome Trace Event JSON
+
+        :param fp: file object opened for writing text
+        :returns: None
+        """
+        json.dump({'traceEvents': self.events(),
+                   'displayTimeUnit': 'ms'}, fp)
@@ -0,0 +1,162 @@
+from __future__ import division
+from __future__ import print_function
+
+import pygame
+
+from .animation import AnimBase, is_number, make_tags
+from .animation import ANIMATION_RUNNING, ANIMATION_FINISHED
+from .transitions import get_transition
+
+__all__ = ('StreamTrack',)
+
+
+class StreamTrack(AnimBase):
+    """ Change values by following a stream of samples
+
+    Some motion comes from recorded paths, physics replays or other
+    procedural sources, and is too long to build as chained Animations.
+    A StreamTrack reads (time, values) samples from any iterable, like
+    a generator, only when they are needed.  Only the two samples
+    around the current time are kept, so memory does not depend on
+    the length of the track.
+
+    Values are a dict of attribute names and numbers:
+
+        def path():
+            for time, x, y in read_recording():
+                yield time, {'x': x, 'y': y}
+
+        track = StreamTrack(path(), sprite.rect)
+        group.add(track)
+
+    If only one attribute is changed, pass its name, and the samples
+    can be (time, number):
+
+        track = StreamTrack(((t, sin(t)) for t in count()), ball, name='y')
+
+    Times are relative to the start of the track and must not go
+    backwards.  Between two samples, the value is interpolated using
+    the transition; 'linear' is the default.  Values are set on the
+    targets like Animation does, so callable attributes and rounding
+    (automatic for pygame Rects) work the same way.
+
+    The track finishes after the last sample.  Calling finish does not
+    read any more samples, so it is safe with endless streams; the
+    values jump to the sample the track was moving to, and the rest of
+    the stream is not read.
+    """
+    _valid_schedules = ('on finish', 'on update')
+    default_transition = 'linear'
+
+    def __init__(self, samples, *targets, **kwargs):
+        super(StreamTrack, self).__init__()
+        if not targets:
+            raise ValueError
+
+        self._samples = iter(samples)
+        self._targets = targets
+        self._name = kwargs.get('name', None)
+        self._round_values = kwargs.get('round_values', False)
+        self._transition = get_transition(
+            kwargs.get('transition', self.default_transition))
+        for target in targets:
+            if isinstance(target, pygame.Rect):
+                self._round_values = True
+        self._elapsed = 0
+        self.tags = make_tags(kwargs.get('tags', None))
+        self._state = ANIMATION_RUNNING
+        self._previous = None
+        self._previous = self._next_sample()
+        if self._previous is None:
+            raise ValueError
+        self._next = self._next_sample()
+
+    def _next_sample(self):
+        """ Read the next sample from the stream
+
+        :returns: (time, dict of values), or None if there are no more
+        :raises: ValueError
+        """
+        try:
+            time, values = next(self._samples)
+        except StopIteration:
+            return None
+
+        if self._name is not None:
+            values = {self._name: values}
+        for value in values.values():
+            is_number(value)
+        if self._previous is not None and time < self._previous[0]:
+            raise ValueError
+        return time, values
+
+    def _apply(self, values):
+        for target in self._targets:
+            for name, value in values.items():
+                self._set_value(target, name, value)
+
+    def update(self, dt):
+        """ Update the track
+
+        :param dt: Time passed since last update.
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return
+
+        self._elapsed += dt
+        elapsed = self._elapsed
+        following = self._next
+        while following is not None and following[0] <= elapsed:
+            self._previous = following
+            following = self._next = self._next_sample()
+
+        time, values = self._previous
+        if following is None:
+            self._apply(values)
+            self._execute_callbacks("on update")
+            self.abort()
+            return
+
+        next_time, next_values = following
+        span = next_time - time
+        p = max(0., (elapsed - time) / span) if span > 0 else 0.
+        t = self._transition(p)
+        for target in self._targets:
+            for name, a in values.items():
+                b = next_values.get(name, a)
+                self._set_value(target, name, (a * (1. - t)) + (b * t))
+
+        if dt:
+            self._execute_callbacks("on update")
+
+    def time_until_next_event(self):
+        """ A running track changes values each update, so this is 0
+
+        :returns: 0, or None if the track is finished
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return None
+        return 0
+
+    def finish(self):
+        """ Apply the values of the next sample, and finish
+
+        The stream is not read any further.
+        """
+        if self._state is not ANIMATION_RUNNING:
+            return
+
+        final = self._next if self._next is not None else self._previous
+        self._apply(final[1])
+        self._execute_callbacks("on update")
+        self.abort()
+
+    def abort(self):
+        """ Stop the track without changing the values
+
+        Finish callbacks will be executed.
+        """
+        self._state = ANIMATION_FINISHED
+        self._samples = self._previous = self._next = None
+        self.kill()
+        self._execute_callbacks("on finish")
@@ -1,6 +1,9 @@
 from math import sqrt, cos, sin, pi
 
-__all__ = ('AnimationTransition',)
+from .backend import speedups
+
+__all__ = ('AnimationTransition', 'Transition', 'register_transition',
+           'get_transition', 'transition_info')
 
 
 class AnimationTransition(object):
@@ -219,3 +222,158 @@ class AnimationTransition(object):
         if p < 1.:
             return AnimationTransition._in_bounce_internal(p, 1.) * .5
         return AnimationTransition._out_bounce_internal(p - 1., 1.) * .5 + .5
+
+
+# AnimationTransition is always pure Python, so the methods keep
+# working with anything that supports arithmetic, like NumPy arrays.
+# Only the registry, which Animations use, gets the compiled versions.
+python_transitions = dict((name, getattr(AnimationTransition, name))
+                          for name in dir(AnimationTransition)
+                          if not name.startswith('_'))
+
+COST_LOW = 'low'        # a few multiplications
+COST_MEDIUM = 'medium'  # square roots or several branches
+COST_HIGH = 'high'      # sin, cos or pow
+
+_registry = dict()      # name: Transition
+_by_function = dict()   # function: Transition
+
+
+class Transition(object):
+    """ A named easing function and some facts about it
+
+    The facts can be used by optimizations that only work for some
+    curves, like lookup tables.
+
+    :ivar name: name used to refer to the transition
+    :ivar function: callable taking progress (0-1) and returning a float
+    :ivar monotonic: True if the curve never goes backwards
+    :ivar piecewise: True if the curve is made from several pieces
+    :ivar cost: one of 'low', 'medium' or 'high'
+    """
+    __slots__ = ('name', 'function', 'monotonic', 'piecewise', 'cost')
+
+    def __init__(self, name, function, monotonic=False, piecewise=False,
+                 cost=COST_HIGH):
+        self.name = name
+        self.function = function
+        self.monotonic = monotonic
+        self.piecewise = piecewise
+        self.cost = cost
+
+    def __repr__(self):
+        return '<Transition {}>'.format(self.name)
+
+
+def register_transition(name, function, monotonic=False, piecewise=False,
+                        cost=COST_HIGH):
+    """ Register an easing function so it can be used by name
+
+        def smoothstep(p):
+            return p * p * (3. - 2. * p)
+
+        register_transition('smoothstep', smoothstep,
+                            monotonic=True, cost='low')
+        ani = Animation(x=100, transition='smoothstep')
+
+    Names of the built in transitions may be replaced.
+
+    :param name: name of the transition
+    :param function: callable taking progress (0-1) and returning a float
+    :param monotonic: True if the curve never goes backwards
+    :param piecewise: True if the curve is made from several pieces
+    :param cost: one of 'low', 'medium' or 'high'
+    :returns: Transition
+    :raises: ValueError
+    """
+    if not callable(function):
+        raise ValueError
+
+    if cost not in (COST_LOW, COST_MEDIUM, COST_HIGH):
+        raise ValueError
+
+    transition = Transition(name, function, monotonic, piecewise, cost)
+    _registry[name] = transition
+    _by_function.setdefault(function, transition)
+    return transition
+
+
+def get_transition(transition):
+    """ Get the easing function for a name or callable
+
+    Names are resolved with one dictionary lookup.  Names that are not
+    registered are looked up on AnimationTransition once and then
+    registered.  Callables are returned unchanged.
+
+    :param transition: name or callable
+    :returns: callable
+    :raises: AttributeError
+    """
+    if callable(transition):
+        return transition
+
+    try:
+        return _registry[transition].function
+    except KeyError:
+        function = getattr(AnimationTransition, transition)
+        return register_transition(transition, function).function
+
+
+def transition_info(transition):
+    """ Get the Transition of a name or easing function
+
+    :param transition: name or callable
+    :returns: Transition, or None if it is not registered
+    """
+    if callable(transition):
+        return _by_function.get(transition)
+    return _registry.get(transition)
+
+
+def _register_builtin(name, **facts):
+    """ Register a method of AnimationTransition by its name
+
+    The compiled version is registered if there is one.  The Python
+    version can be found with transition_info too.
+
+    :param name: name of a method of AnimationTransition
+    :returns: Transition
+    """
+    function = getattr(AnimationTransition, name)
+    transition = register_transition(name, getattr(speedups, name, function),
+                                     **facts)
+    _by_function.setdefault(function, transition)
+    return transition
+
+
+def _register_builtins():
+    powers = ('quad', 'cubic', 'quart', 'quint')
+    for name in powers:
+        for kind in ('in_', 'out_'):
+            _register_builtin(kind + name, monotonic=True, cost=COST_LOW)
+        _register_builtin('in_out_' + name, monotonic=True, piecewise=True,
+                          cost=COST_LOW)
+
+    _register_builtin('linear', monotonic=True, cost=COST_LOW)
+    _register_builtin('in_sine', monotonic=True)
+    _register_builtin('out_sine', monotonic=True)
+    _register_builtin('in_out_sine', monotonic=True)
+    _register_builtin('in_expo', monotonic=True, piecewise=True)
+    _register_builtin('out_expo', monotonic=True, piecewise=True)
+    _register_builtin('in_out_expo', monotonic=True, piecewise=True)
+    _register_builtin('in_circ', monotonic=True, cost=COST_MEDIUM)
+    _register_builtin('out_circ', monotonic=True, cost=COST_MEDIUM)
+    _register_builtin('in_out_circ', monotonic=True, piecewise=True,
+                      cost=COST_MEDIUM)
+    _register_builtin('in_elastic', piecewise=True)
+    _register_builtin('out_elastic', piecewise=True)
+    _register_builtin('in_out_elastic', piecewise=True)
+    _register_builtin('in_back', cost=COST_LOW)
+    _register_builtin('out_back', cost=COST_LOW)
+    _register_builtin('in_out_back', piecewise=True, cost=COST_LOW)
+    _register_builtin('in_bounce', piecewise=True, cost=COST_MEDIUM)
+    _register_builtin('out_bounce', piecewise=True, cost=COST_MEDIUM)
+    _register_builtin('in_out_bounce', piecewise=True, cost=COST_MEDIUM)
+
+
+_register_builtins()
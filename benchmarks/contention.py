@@ -0,0 +1,80 @@
+""" Contention benchmark for AnimationGroup.submit
+
+Many producer threads submit callbacks while the main thread updates
+the group, like asset loaders and network handlers do in a game.  The
+same load is run through a queue.Queue, which uses a lock, to compare.
+
+    PYTHONPATH=. python benchmarks/contention.py [threads] [count]
+"""
+from __future__ import division
+from __future__ import print_function
+
+import sys
+from threading import Thread
+from timeit import default_timer
+
+try:
+    from queue import Empty, Queue
+except ImportError:
+    from Queue import Empty, Queue
+
+from animation import AnimationGroup
+
+
+def noop():
+    pass
+
+
+def run(threads, count, submit, tick):
+    """ Run producers until done, ticking the main thread meanwhile
+
+    :returns: (seconds, ticks)
+    """
+    def produce():
+        for i in range(count):
+            submit(noop)
+
+    producers = [Thread(target=produce) for i in range(threads)]
+    start = default_timer()
+    for producer in producers:
+        producer.start()
+    ticks = 0
+    while any(producer.is_alive() for producer in producers):
+        tick()
+        ticks += 1
+    tick()
+    return default_timer() - start, ticks
+
+
+def bench_group(threads, count):
+    group = AnimationGroup()
+    return run(threads, count, group.submit, lambda: group.update(16))
+
+
+def bench_locked(threads, count):
+    queue = Queue()
+
+    def tick():
+        while True:
+            try:
+                queue.get_nowait()()
+            except Empty:
+                break
+
+    return run(threads, count, queue.put, tick)
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    total = threads * count
+    print('{} threads, {} submissions'.format(threads, total))
+    for name, bench in (('AnimationGroup.submit', bench_group),
+                        ('queue.Queue', bench_locked)):
+        elapsed, ticks = bench(threads, count)
+        print('{:24} {:8.3f} s {:8.0f} ns/submission {:8} ticks'.format(
+            name, elapsed, elapsed / total * 1e9, ticks))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+""" Benchmark of the compiled speedups against pure Python
+
+The backend is chosen when the package is imported, so each backend is
+run in its own process.  Each run updates animations of two attributes
+until they are half way, and times a transition by name.
+
+    PYTHONPATH=. python benchmarks/speedups.py [animations] [transition]
+"""
+from __future__ import division
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+from timeit import repeat
+
+
+class Target(object):
+    def __init__(self):
+        self.x = 0.
+        self.y = 0.
+
+
+def bench(count, transition):
+    from animation import Animation
+    from animation.backend import BACKEND
+    from animation.transitions import get_transition
+
+    animations = [Animation(Target(), x=100, y=50, duration=1e9,
+                            transition=transition) for i in range(count)]
+
+    def update():
+        for animation in animations:
+            animation.update(1)
+
+    updates = min(repeat(update, number=20, repeat=5)) / 20
+    function = get_transition(transition)
+    calls = min(repeat(lambda: function(.3), number=100000, repeat=5)) / 1e5
+    print('{:8} {:10.3f} ms/update of {} {:10.1f} ns/transition'.format(
+        BACKEND, updates * 1e3, count, calls * 1e9))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    transition = sys.argv[2] if len(sys.argv) > 2 else 'in_out_sine'
+    if os.environ.get('ANIMATION_BENCH_CHILD'):
+        bench(count, transition)
+        return
+
+    print('{} animations of two attributes, {}'.format(count, transition))
+    for pure in ('', '1'):
+        env = dict(os.environ, ANIMATION_BENCH_CHILD='1',
+                   ANIMATION_PURE_PYTHON=pure)
+        subprocess.check_call([sys.executable] + sys.argv, env=env)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,24 @@
 #!/usr/bin/env python
 # -*- encoding: utf-8 -*-
 
-from setuptools import setup
+import platform
+import sys
+
+from setuptools import Extension, setup
+
+# the compiled speedups are optional; if they cannot be built, the
+# pure Python versions are used.  floating point contraction is turned
+# off so both versions give the same results.
+extra_compile_args = []
+if sys.platform != 'win32':
+    extra_compile_args.append('-ffp-contract=off')
+
+ext_modules = []
+if platform.python_implementation() == 'CPython':
+    ext_modules.append(Extension('animation._speedups',
+                                 ['animation/_speedups.c'],
+                                 extra_compile_args=extra_compile_args,
+                                 optional=True))
 
 setup(name="pygame-animation",
       version="0.0.5",
@@ -9,6 +26,7 @@ setup(name="pygame-animation",
       author="bitcraft",
       author_email="",
       packages=['animation'],
+      ext_modules=ext_modules,
       license="GPLv3",
       url="https://github.com/bitcraft/animation",
       download_url="",
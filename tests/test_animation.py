@@ -1,9 +1,11 @@
 from unittest import TestCase, skip
 
 from mock import Mock
+from pygame import Rect
 from pygame.sprite import Group
 
-from animation import Animation, Task, remove_animations_of
+from animation import Animation, Task, TaskSequence, ViewportCulling, \
+    remove_animations_of
 from animation.animation import is_number
 
 
@@ -11,9 +13,13 @@ class TestObject:
     """ Mocks don't work well with animations due to introspection,
     so this is to be used instead of a mock.
     """
+    # not a test case, even though the name starts with Test
+    __test__ = False
 
-    def __init__(self):
-        self.value = 0.0
+    def __init__(self, value=0.0):
+        self.value = value
+        self.x = 0.0
+        self.y = 0.0
         self.illegal_value = 'spam'
         self.callable = Mock(return_value=0)
         self.initial = 0.0
@@ -219,6 +225,15 @@ class TestAnimation(TestCase):
         # may be more as the mock is called to get initial value
         self.assertGreaterEqual(m.call_count, 101)
 
+    def test_update_without_callbacks_stores_nothing(self):
+        """ verify that updating does not make empty lists of callbacks
+        """
+        a = Animation(value=1, duration=100)
+        a.start(self.mock)
+        a.update(1)
+        a.finish()
+        self.assertEqual(dict(a._callbacks), {})
+
     def test_final_callback_called_when_finished(self):
         """ verify that callback is called during the finalizer when finishes
         """
@@ -384,6 +399,122 @@ class TestAnimation(TestCase):
         with self.assertRaises(RuntimeError):
             a.start(None)
 
+    def test_start_many(self):
+        m0, m1 = TestObject(), TestObject()
+        a0 = Animation(value=1, duration=1)
+        a1 = Animation(value=2, duration=1)
+        started = Animation.start_many([(a0, m0), (a1, m1)])
+        self.assertEqual(started, [a0, a1])
+        a0.update(1)
+        a1.update(1)
+        self.assertEqual(m0.value, 1)
+        self.assertEqual(m1.value, 2)
+
+    def test_start_many_started_raises_runtimeerror(self):
+        a0 = Animation(value=1)
+        a1 = Animation(value=1)
+        a1.start(self.mock)
+        with self.assertRaises(RuntimeError):
+            Animation.start_many([(a0, TestObject()), (a1, TestObject())])
+
+        # nothing was started if one of them fails
+        a0.start(self.mock)
+
+    def test_start_many_fails_partway(self):
+        m0, m1 = TestObject(), TestObject()
+        a0 = Animation(value=1, duration=1)
+        a1 = Animation(illegal_value=1, duration=1)
+        with self.assertRaises(ValueError):
+            Animation.start_many([(a0, m0), (a1, m1)])
+
+        # nothing was started, so they can be started again
+        self.assertEqual(a0._targets, [])
+        self.assertEqual(a1._targets, [])
+        Animation.start_many([(a0, m0)])
+        a0.update(1)
+        self.assertEqual(m0.value, 1)
+        m1.illegal_value = 0
+        a1.start(m1)
+
+    def test_start_many_same_animation_raises_runtimeerror(self):
+        a = Animation(value=1)
+        with self.assertRaises(RuntimeError):
+            Animation.start_many([(a, TestObject()), (a, TestObject())])
+        a.start(self.mock)
+
+    def test_start_many_primes_callable(self):
+        a = Animation(callable=1, duration=1)
+        Animation.start_many([(a, self.mock)])
+        self.assertEqual(self.mock.callable.call_args[0], (0,))
+
+    def test_gather_initial_values_needs_priming(self):
+        a = Animation(value=1)
+        a._pre_targets = (self.mock,)
+        self.assertFalse(a._gather_initial_values())
+
+        a = Animation(callable=1)
+        a._pre_targets = (self.mock,)
+        self.assertTrue(a._gather_initial_values())
+
+        a = Animation(value=1, initial=0)
+        a._pre_targets = (self.mock,)
+        self.assertTrue(a._gather_initial_values())
+
+    def test_culled_target_is_not_changed(self):
+        m = Mock()
+        a = Animation(value=1, duration=4)
+        a.visible = lambda target, props: target.visible
+        a.schedule(m, 'on update')
+        self.mock.visible = False
+        a.start(self.mock)
+        a.update(1)
+        self.assertEqual(self.mock.value, 0)
+        self.assertTrue(m.called)
+
+        # correct value is set when visible again
+        self.mock.visible = True
+        a.update(1)
+        self.assertEqual(self.mock.value, .5)
+
+    def test_culled_target_is_finished(self):
+        a = Animation(value=1, duration=1)
+        a.visible = lambda target, props: False
+        a.start(self.mock)
+        a.update(1)
+        self.assertEqual(self.mock.value, 1)
+
+    def test_viewport_culling(self):
+        viewport = Rect(0, 0, 100, 100)
+        visible = ViewportCulling(viewport)
+        self.assertTrue(visible(self.mock, {}))
+        self.assertFalse(visible(Rect(200, 0, 10, 10), {'x': (200, 300)}))
+
+        # rect will be moved through the viewport
+        self.assertTrue(visible(Rect(-50, 0, 10, 10), {'x': (-50, 200)}))
+
+        visible.margin = 20
+        self.assertTrue(visible(Rect(110, 0, 10, 10), {'x': (110, 115)}))
+
+    def test_viewport_culling_animation(self):
+        viewport = Rect(0, 0, 100, 100)
+        rect = Rect(200, 0, 10, 10)
+        a = Animation(rect, x=300, duration=4)
+        a.visible = ViewportCulling(viewport)
+        a.update(1)
+        self.assertEqual(rect.x, 200)
+
+        # the viewport is not copied, so it can move like a camera
+        viewport.x = 250
+        a.update(1)
+        self.assertEqual(rect.x, 250)
+
+        viewport.x = 0
+        a.update(1)
+        self.assertEqual(rect.x, 250)
+        a.visible.margin = 200
+        a.update(1)
+        self.assertEqual(rect.x, 300)
+
 
 class TestTask(TestCase):
     def simulate(self, object_, duration=1, step=1):
@@ -469,3 +600,77 @@ class TestTask(TestCase):
     def test_chain_non_Task_raises_TypeError(self):
         with self.assertRaises(TypeError):
             Task(Mock()).chain(None)
+
+
+class TestTaskSequence(TestCase):
+    def test_duration(self):
+        t0 = Task(Mock(), interval=10, times=2)
+        t1, t2 = t0.chain(Task(Mock(), interval=5), Task(Mock(), interval=1))
+        t1.chain(Task(Mock(), interval=3))
+        s = TaskSequence(t0)
+        self.assertEqual(s.duration, 28)
+        s.update(8)
+        self.assertEqual(s.remaining, 20)
+
+    def test_forever_raises_valueerror(self):
+        with self.assertRaises(ValueError):
+            TaskSequence(Task(Mock(), interval=1, times=-1))
+
+    def test_long_chain(self):
+        m = Mock()
+        first = task = Task(m, interval=1)
+        for i in range(5000):
+            task = task.chain(Task(m, interval=1))[0]
+        s = TaskSequence(first)
+        self.assertEqual(s.duration, 5001)
+        s.update(5001)
+        self.assertEqual(m.call_count, 5001)
+
+    def test_forever_in_chain_raises_valueerror(self):
+        t0 = Task(Mock(), interval=1)
+        t0.chain(Task(Mock(), interval=1, times=-1))
+        with self.assertRaises(ValueError):
+            TaskSequence(t0)
+
+    def test_non_Task_raises_TypeError(self):
+        with self.assertRaises(TypeError):
+            TaskSequence(None)
+
+    def test_order_without_groups(self):
+        order = list()
+        t0 = Task(lambda: order.append(0), interval=1, times=2)
+        t1 = t0.chain(Task(lambda: order.append(1), interval=1))[0]
+        t1.chain(Task(lambda: order.append(2), interval=0))
+        m = Mock()
+        s = TaskSequence(t0)
+        s.schedule(m)
+        g = Group(s)
+
+        g.update(1)
+        self.assertEqual(order, [0])
+        self.assertEqual(len(g), 1)
+
+        # all intervals that are due are executed in order
+        g.update(2)
+        self.assertEqual(order, [0, 0, 1, 2])
+        self.assertTrue(m.called)
+        self.assertNotIn(s, g)
+
+    def test_aborted_task_skips_chain(self):
+        m = Mock()
+        t0 = Task(Mock(), interval=1)
+        t1 = t0.chain(Task(Mock(), interval=1))[0]
+        t1.chain(Task(m, interval=1))
+        s = TaskSequence(t0)
+        t1.abort()
+        s.update(5)
+        self.assertFalse(m.called)
+
+    def test_finish(self):
+        m0, m1 = Mock(), Mock()
+        t0 = Task(m0, interval=10)
+        t0.chain(Task(m1, interval=10))
+        s = TaskSequence(t0)
+        s.finish()
+        self.assertTrue(m0.called)
+        self.assertTrue(m1.called)
@@ -0,0 +1,83 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from animation import Animation, BakeCache
+from animation.transitions import AnimationTransition, get_transition
+
+from test_animation import TestObject
+
+
+class TestBakeCache(TestCase):
+    def setUp(self):
+        self.cache = BakeCache(step=10)
+
+    def test_samples_match_transition(self):
+        transition = get_transition('out_bounce')
+        curve = self.cache.curve(transition, 100)
+        self.assertEqual(len(curve), 11)
+        for i in range(11):
+            self.assertEqual(curve(i / 10.), transition(i / 10.))
+        self.assertEqual(curve(1.), transition(1.))
+
+    def test_transition_computed_once(self):
+        transition = Mock(side_effect=lambda p: p * p)
+        a = Animation(TestObject(), value=1, duration=100,
+                      transition=transition, bake=self.cache)
+        b = Animation(TestObject(), value=1, duration=100,
+                      transition=transition, bake=self.cache)
+        calls = transition.call_count
+        for i in range(10):
+            a.update(10)
+            b.update(10)
+        self.assertEqual(transition.call_count, calls)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_same_values_as_not_baked(self):
+        mock = TestObject()
+        other = TestObject()
+        a = Animation(mock, value=100, duration=95, transition='in_out_quad',
+                      bake=self.cache)
+        b = Animation(other, value=100, duration=95, transition='in_out_quad')
+        for i in range(10):
+            a.update(10)
+            b.update(10)
+            self.assertAlmostEqual(mock.value, other.value)
+
+    def test_interpolate(self):
+        transition = AnimationTransition.in_quad
+        curve = self.cache.curve(transition, 100)
+        self.assertEqual(curve(.15), (transition(.1) + transition(.2)) / 2.)
+
+    def test_fallback(self):
+        cache = BakeCache(step=10, interpolate=False)
+        transition = AnimationTransition.in_quad
+        curve = cache.curve(transition, 100)
+        self.assertEqual(curve(.15), transition(.15))
+        self.assertEqual(cache.fallbacks, 1)
+
+    def test_lru_eviction(self):
+        cache = BakeCache(step=10, max_samples=25)
+        linear = AnimationTransition.linear
+        in_quad = AnimationTransition.in_quad
+        a = cache.curve(linear, 100)
+        cache.curve(in_quad, 100)
+        cache.curve(linear, 100)
+        cache.curve(linear, 50)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIs(cache.curve(linear, 100), a)
+        self.assertEqual(cache.stats()['curves'], 2)
+        self.assertEqual(cache.stats()['samples'], 17)
+
+    def test_too_big_is_not_baked(self):
+        cache = BakeCache(step=1, max_samples=10)
+        transition = AnimationTransition.linear
+        self.assertIsNone(cache.curve(transition, 100))
+        self.assertEqual(len(cache), 0)
+
+    def test_reset_stats(self):
+        self.cache.curve(AnimationTransition.linear, 100)
+        self.cache.reset_stats()
+        self.assertEqual(self.cache.stats()['misses'], 0)
+        self.assertEqual(self.cache.stats()['curves'], 1)
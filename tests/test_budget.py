@@ -0,0 +1,71 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from animation import AnimationGroup, CallbackBudget, Task
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.time = 0
+
+    def __call__(self):
+        self.time += 1
+        return self.time
+
+
+class TestCallbackBudget(TestCase):
+    def test_no_limit_raises_valueerror(self):
+        with self.assertRaises(ValueError):
+            CallbackBudget()
+
+    def test_count_limit_defers_in_order(self):
+        order = list()
+        budget = CallbackBudget(max_count=2)
+        for i in range(5):
+            budget.submit(lambda i=i: order.append(i))
+
+        self.assertEqual(budget.run(), 2)
+        self.assertEqual(order, [0, 1])
+        budget.run()
+        self.assertEqual(order, [0, 1, 2, 3])
+        self.assertEqual(budget.stats()['deferred'], 4)
+        self.assertEqual(budget.stats()['max_pending'], 3)
+
+    def test_priority(self):
+        order = list()
+        budget = CallbackBudget(max_count=1)
+        budget.submit(lambda: order.append('low'))
+        budget.submit(lambda: order.append('high'), priority=1)
+        budget.run()
+        self.assertEqual(order, ['high'])
+
+    def test_time_limit(self):
+        m = Mock()
+        budget = CallbackBudget(max_time=2, clock=FakeClock())
+        for i in range(5):
+            budget.submit(m)
+        budget.run()
+        self.assertEqual(m.call_count, 2)
+
+    def test_flush(self):
+        m = Mock()
+        budget = CallbackBudget(max_count=1)
+        for i in range(5):
+            budget.submit(m)
+        self.assertEqual(budget.flush(), 5)
+        self.assertEqual(len(budget), 0)
+
+    def test_group_budget(self):
+        m = Mock()
+        budget = CallbackBudget(max_count=2)
+        g = AnimationGroup(budget=budget)
+        for i in range(3):
+            g.add(Task(m, interval=1))
+
+        g.update(1)
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual(len(g.finished), 3)
+
+        g.update(1)
+        self.assertEqual(m.call_count, 3)
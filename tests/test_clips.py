@@ -0,0 +1,116 @@
+import os
+import tempfile
+from io import BytesIO
+from unittest import TestCase, skipIf
+
+from mock import Mock
+from pygame.sprite import Group
+
+from animation import ClipLibrary, ClipPlayer, write_clips
+
+from test_animation import TestObject
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CLIPS = {
+    'slide': (('x', 'y'), [
+        (0, 'linear', (0, 0)),
+        (10, 'in_quad', (100, 10)),
+        (20, 'linear', (0, 10)),
+    ]),
+    'fade': (('value',), [
+        (0, 'linear', (0,)),
+        (4, 'linear', (1,)),
+    ]),
+}
+
+
+def make_library():
+    fp = BytesIO()
+    write_clips(fp, CLIPS)
+    return ClipLibrary(fp.getvalue())
+
+
+class TestClips(TestCase):
+    def setUp(self):
+        self.mock = TestObject()
+
+    def test_read_clips(self):
+        library = make_library()
+        self.assertEqual(len(library), 2)
+        self.assertIn('slide', library)
+        clip = library['slide']
+        self.assertEqual(clip.channels, ('x', 'y'))
+        self.assertEqual(len(clip), 3)
+        self.assertEqual(clip.duration, 20)
+        self.assertEqual(clip.keyframe(1)[2], (100, 10))
+
+    def test_find(self):
+        clip = make_library()['slide']
+        self.assertEqual(clip.find(0), 0)
+        self.assertEqual(clip.find(15, 0), 1)
+        self.assertEqual(clip.find(5, 2), 0)
+        self.assertEqual(clip.find(25), 2)
+
+    def test_bad_file_raises_valueerror(self):
+        with self.assertRaises(ValueError):
+            ClipLibrary(b'SOMETHING ELSE, SOMETHING ELSE')
+
+    def test_bad_keyframes_raise_valueerror(self):
+        with self.assertRaises(ValueError):
+            write_clips(BytesIO(), {'a': (('x',), [])})
+
+        with self.assertRaises(ValueError):
+            write_clips(BytesIO(), {'a': (('x',), [(0, 'linear', (0, 1))])})
+
+        with self.assertRaises(ValueError):
+            write_clips(BytesIO(), {'a': (('x',), [(1, 'linear', (0,)),
+                                                   (0, 'linear', (0,))])})
+
+    def test_player(self):
+        m = Mock()
+        player = ClipPlayer(make_library()['slide'], self.mock)
+        player.schedule(m)
+        g = Group(player)
+        player.update(5)
+        self.assertEqual((self.mock.x, self.mock.y), (50, 5))
+        player.update(10)
+        self.assertEqual((self.mock.x, self.mock.y), (75, 10))
+        player.update(5)
+        self.assertEqual((self.mock.x, self.mock.y), (0, 10))
+        self.assertTrue(m.called)
+        self.assertNotIn(player, g)
+
+    def test_players_share_clip_with_offset(self):
+        clip = make_library()['fade']
+        objects = [TestObject() for i in range(3)]
+        players = [ClipPlayer(clip, o, offset=i) for i, o in enumerate(objects)]
+        for player in players:
+            player.update(1)
+        self.assertEqual([o.value for o in objects], [.25, .5, .75])
+
+    def test_loop(self):
+        player = ClipPlayer(make_library()['fade'], self.mock, loop=True)
+        player.update(5)
+        self.assertEqual(self.mock.value, .25)
+
+    def test_memory_map(self):
+        fd, path = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                write_clips(fp, CLIPS)
+            with ClipLibrary.open(path) as library:
+                player = ClipPlayer(library['fade'], self.mock)
+                player.update(2)
+                self.assertEqual(self.mock.value, .5)
+        finally:
+            os.remove(path)
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_as_array(self):
+        array = make_library()['slide'].as_array()
+        self.assertEqual(list(array['time']), [0, 10, 20])
+        self.assertEqual(list(array['values'][1]), [100, 10])
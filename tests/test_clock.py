@@ -0,0 +1,80 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from animation import Animation, AnimationGroup, StreamTrack, Task, \
+    VirtualClock
+
+from test_animation import TestObject
+
+
+class TestVirtualClock(TestCase):
+    def setUp(self):
+        self.group = AnimationGroup()
+        self.clock = VirtualClock(self.group, step=16)
+        self.log = list()
+
+    def record(self, name):
+        return lambda: self.log.append((name, self.clock.time))
+
+    def test_step_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            VirtualClock(self.group, step=0)
+
+    def test_callbacks_in_order_they_are_due(self):
+        a = Animation(TestObject(), value=1, duration=500)
+        a.schedule(self.record('animation'))
+        self.group.add(Task(self.record('late'), 700))
+        self.group.add(Task(self.record('early'), 300))
+        self.group.add(a)
+
+        self.clock.advance(1000)
+        self.assertEqual([i[0] for i in self.log],
+                         ['early', 'animation', 'late'])
+        self.assertEqual(self.clock.time, 1000)
+
+    def test_jumps_between_events(self):
+        task = Task(self.record('tick'), 1000, 3600)
+        self.group.add(task)
+        updates = self.clock.advance(3600 * 1000)
+        self.assertEqual(len(self.log), 3600)
+        self.assertLessEqual(updates, 3700)
+        self.assertEqual(self.log[-1][0], 'tick')
+
+    def test_delayed_animation(self):
+        mock = TestObject()
+        a = Animation(mock, value=1, duration=100, delay=50)
+        a.schedule(self.record('done'))
+        self.group.add(a)
+        self.clock.advance(100)
+        self.assertEqual(mock.value, .5)
+        self.clock.advance(1000)
+        self.assertEqual(mock.value, 1)
+        self.assertEqual(len(self.log), 1)
+
+    def test_continuous_members_are_stepped(self):
+        m = Mock()
+        track = StreamTrack(((i, float(i)) for i in range(0, 1000, 10)),
+                            TestObject(), name='value')
+        track.schedule(m, 'on update')
+        self.group.add(track)
+        updates = self.clock.advance(160)
+        self.assertEqual(updates, 10)
+        self.assertEqual(m.call_count, 10)
+
+    def test_run_until_idle(self):
+        self.group.add(Task(self.record('a'), 100, 5))
+        self.clock.run()
+        self.assertEqual(self.log, [('a', i * 100) for i in range(1, 6)])
+
+    def test_run_limit(self):
+        self.group.add(Task(self.record('a'), 100, -1))
+        self.clock.run(limit=350)
+        self.assertEqual(len(self.log), 3)
+        self.assertEqual(self.clock.time, 350)
+
+    def test_time_scale(self):
+        self.group.time_scale = 2.
+        self.group.add(Task(self.record('a'), 100))
+        self.clock.advance(100)
+        self.assertEqual(self.log, [('a', 50)])
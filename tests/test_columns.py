@@ -0,0 +1,84 @@
+from array import array
+from unittest import TestCase, skipIf
+
+from mock import Mock
+
+from animation import AnimationGroup, ColumnAnimation
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestColumnAnimation(TestCase):
+    def test_list_index(self):
+        column = [0., 0., 0.]
+        a = ColumnAnimation(column, 1, 10, duration=2)
+        a.update(1)
+        self.assertEqual(column, [0., 5., 0.])
+        a.update(1)
+        self.assertEqual(column, [0., 10., 0.])
+
+    def test_list_slice_with_values(self):
+        column = [0., 0., 0., 0.]
+        a = ColumnAnimation(column, slice(1, 3), [10, 20], duration=1)
+        a.update(1)
+        self.assertEqual(column, [0., 10., 20., 0.])
+
+    def test_relative_and_round_values(self):
+        column = [1, 1]
+        a = ColumnAnimation(column, [0, 1], 1.2, duration=1,
+                            relative=True, round_values=True)
+        a.update(.5)
+        self.assertEqual(column, [2, 2])
+
+    def test_wrong_number_of_values_raises_valueerror(self):
+        with self.assertRaises(ValueError):
+            ColumnAnimation([0, 0], [0, 1], [1, 2, 3])
+
+    def test_finish_callback(self):
+        m = Mock()
+        column = [0.]
+        a = ColumnAnimation(column, 0, 1, duration=1)
+        a.schedule(m)
+        a.finish()
+        self.assertEqual(column, [1.])
+        self.assertTrue(m.called)
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_column(self):
+        column = numpy.zeros(4)
+        a = ColumnAnimation(column, [0, 2], [2, 4], duration=2)
+        a.update(1)
+        self.assertEqual(list(column), [1., 0., 2., 0.])
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_integer_column_is_rounded(self):
+        column = numpy.zeros(2, dtype=int)
+        a = ColumnAnimation(column, [0, 1], [19, 99], duration=10)
+        a.update(1)
+        self.assertEqual(list(column), [2, 10])
+
+    def test_integer_array_is_rounded(self):
+        column = array('i', [0, 0])
+        a = ColumnAnimation(column, [0, 1], [19, 99], duration=10)
+        a.update(1)
+        self.assertEqual(list(column), [2, 10])
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_group_writes_once_after_update(self):
+        column = numpy.zeros(4)
+        a0 = ColumnAnimation(column, 0, 2, duration=2)
+        a1 = ColumnAnimation(column, slice(2, 4), 4, duration=2)
+        g = AnimationGroup(a0, a1)
+        a0.update(1)
+        self.assertEqual(list(column), [0., 0., 0., 0.])
+
+        g.update(0)
+        self.assertEqual(list(column), [1., 0., 0., 0.])
+
+        g.update(1)
+        self.assertEqual(list(column), [2., 0., 2., 2.])
+        self.assertNotIn(a0, g)
+        self.assertIn(a1, g)
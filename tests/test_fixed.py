@@ -0,0 +1,81 @@
+from unittest import TestCase
+
+from animation import AnimationGroup, FixedAnimation
+from animation.fixed import ONE, TABLE_SIZE, fixed_table, table_checksum
+
+from test_animation import TestObject
+
+BUILTIN = (
+    'linear', 'in_quad', 'out_quad', 'in_out_quad', 'in_cubic', 'out_cubic',
+    'in_out_cubic', 'in_quart', 'out_quart', 'in_out_quart', 'in_quint',
+    'out_quint', 'in_out_quint', 'in_sine', 'out_sine', 'in_out_sine',
+    'in_expo', 'out_expo', 'in_out_expo', 'in_circ', 'out_circ',
+    'in_out_circ', 'in_elastic', 'out_elastic', 'in_out_elastic', 'in_back',
+    'out_back', 'in_out_back', 'in_bounce', 'out_bounce', 'in_out_bounce')
+
+
+class TestFixedAnimation(TestCase):
+    def setUp(self):
+        self.mock = TestObject(0)
+
+    def test_tables_are_identical_everywhere(self):
+        # if this fails, the tables differ from the ones of other builds
+        self.assertEqual(table_checksum(*BUILTIN), 1476921888)
+
+    def test_table_ends(self):
+        for name in BUILTIN:
+            table = fixed_table(name)
+            self.assertEqual(len(table), TABLE_SIZE + 1)
+            self.assertEqual(table[-1], ONE)
+
+    def test_unregistered_transition_raises_valueerror(self):
+        with self.assertRaises(ValueError):
+            fixed_table(lambda p: p)
+
+    def test_integer_values(self):
+        a = FixedAnimation(self.mock, value=1000, duration=300)
+        a.update(100)
+        self.assertEqual(self.mock.value, 333)
+        self.assertIsInstance(self.mock.value, int)
+        a.update(50)
+        self.assertEqual(self.mock.value, 500)
+        a.update(150)
+        self.assertEqual(self.mock.value, 1000)
+
+    def test_transition(self):
+        a = FixedAnimation(self.mock, value=-1000, duration=100,
+                           transition='in_quad')
+        a.update(50)
+        self.assertEqual(self.mock.value, -250)
+
+    def test_float_values_raise_valueerror(self):
+        with self.assertRaises(ValueError):
+            FixedAnimation(self.mock, value=1.5)
+
+        with self.assertRaises(ValueError):
+            FixedAnimation(value=1, duration=1.5)
+
+    def test_float_time_raises_valueerror(self):
+        a = FixedAnimation(self.mock, value=100, duration=100)
+        with self.assertRaises(ValueError):
+            a.update(16.5)
+        self.assertEqual(self.mock.value, 0)
+
+        a.update(16.0)
+        self.assertEqual(self.mock.value, 16)
+        self.assertIsInstance(self.mock.value, int)
+
+    def test_in_group(self):
+        a = FixedAnimation(self.mock, value=100, duration=100)
+        g = AnimationGroup(a)
+        g.update(25)
+        self.assertEqual(self.mock.value, 25)
+
+    def test_delay(self):
+        a = FixedAnimation(self.mock, value=100, duration=100, delay=50)
+        a.update(50)
+        self.assertEqual(self.mock.value, 0)
+        a.update(10)
+        self.assertEqual(self.mock.value, 0)
+        a.update(40)
+        self.assertEqual(self.mock.value, 50)
@@ -0,0 +1,422 @@
+import tracemalloc
+from threading import Thread
+from unittest import TestCase, skipUnless
+
+import pygame
+from mock import Mock
+
+from animation import Animation, AnimationGroup, CallbackBudget, Task, \
+    VirtualClock
+
+from test_animation import TestObject
+
+
+class TestAnimationGroup(TestCase):
+    def setUp(self):
+        self.mock = TestObject()
+
+    def test_time_scale(self):
+        g = AnimationGroup(time_scale=.5)
+        g.add(Animation(self.mock, value=1, duration=1))
+        g.update(1)
+        self.assertEqual(self.mock.value, .5)
+
+    def test_pause_does_not_update(self):
+        m = Mock()
+        g = AnimationGroup(Task(m, interval=1))
+        g.pause()
+        g.update(1)
+        self.assertFalse(m.called)
+
+        g.resume()
+        g.update(1)
+        self.assertTrue(m.called)
+
+    def test_nested_time_scale(self):
+        world = AnimationGroup(time_scale=.5)
+        effects = AnimationGroup(parent=world, time_scale=.5)
+        effects.add(Animation(self.mock, value=1, duration=1))
+        self.assertEqual(effects.effective_time_scale, .25)
+
+        world.update(1)
+        self.assertEqual(self.mock.value, .25)
+
+    def test_pause_parent_pauses_children(self):
+        world = AnimationGroup()
+        effects = AnimationGroup(parent=world)
+        effects.add(Animation(self.mock, value=1, duration=1))
+        world.pause()
+        self.assertTrue(effects.paused)
+        world.update(1)
+        self.assertEqual(self.mock.value, 0)
+
+    def test_change_parent(self):
+        world = AnimationGroup()
+        ui = AnimationGroup()
+        effects = AnimationGroup(parent=world)
+        effects.parent = ui
+        self.assertNotIn(effects, world.children)
+        self.assertIn(effects, ui.children)
+
+    def test_deferred_callbacks_run_after_update(self):
+        order = list()
+        a0 = Animation(self.mock, value=1, duration=1)
+        a0.schedule(lambda: order.append('finish'))
+        a1 = Animation(TestObject(), value=1, duration=2)
+        a1.schedule(lambda: order.append('update'), 'on update')
+        g = AnimationGroup(a0, a1, deferred=True)
+        g.update(1)
+        self.assertEqual(order, ['update', 'finish'])
+        self.assertEqual(g.finished, [a0])
+
+        g.update(.5)
+        self.assertEqual(g.finished, [])
+
+    def test_deferred_task_intervals(self):
+        m = Mock()
+        g = AnimationGroup(Task(m, interval=1, times=3), deferred=True)
+        g.update(1)
+        self.assertEqual(m.call_count, 1)
+
+    def test_deferred_abort(self):
+        m = Mock()
+        a = Animation(self.mock, value=1)
+        a.schedule(m)
+        g = AnimationGroup(a, deferred=True)
+        a.abort()
+        self.assertFalse(m.called)
+        g.drain()
+        self.assertTrue(m.called)
+        self.assertEqual(g.finished, [a])
+
+    def test_removed_member_is_not_deferred(self):
+        m = Mock()
+        a = Animation(self.mock, value=1)
+        a.schedule(m)
+        g = AnimationGroup(a, deferred=True)
+        g.remove(a)
+        a.abort()
+        self.assertTrue(m.called)
+
+    def test_time_until_next_event(self):
+        g = AnimationGroup(time_scale=2.)
+        self.assertIsNone(g.time_until_next_event())
+
+        g.add(Task(Mock(), interval=10))
+        self.assertEqual(g.time_until_next_event(), 5)
+
+        g.update(2)
+        self.assertEqual(g.time_until_next_event(), 3)
+
+        g.add(Animation(self.mock, value=1, delay=4))
+        self.assertEqual(g.time_until_next_event(), 2)
+
+        g.add(Animation(self.mock, value=1))
+        self.assertEqual(g.time_until_next_event(), 0)
+
+        g.pause()
+        self.assertIsNone(g.time_until_next_event())
+
+    def test_time_until_pending_work(self):
+        g = AnimationGroup()
+        a = Animation(value=1, duration=10)
+        g.submit_start(a, self.mock)
+        self.assertEqual(g.time_until_next_event(), 0)
+        self.assertEqual(g.time_until_next_callback(), 0)
+        g.update(0)
+        self.assertIn(a, g)
+        self.assertEqual(g.time_until_next_callback(), 10)
+
+        m = Mock()
+        budget = CallbackBudget(max_count=1)
+        g = AnimationGroup(budget=budget)
+        g.add(Task(m), Task(m))
+        g.update(1)
+        self.assertEqual(len(budget), 1)
+        self.assertEqual(g.time_until_next_event(), 0)
+        g.update(0)
+        self.assertIsNone(g.time_until_next_event())
+        self.assertEqual(m.call_count, 2)
+
+    def test_virtual_clock_runs_pending_work(self):
+        m = Mock()
+        g = AnimationGroup()
+        g.submit(m)
+        VirtualClock(g, step=1).run()
+        self.assertTrue(m.called)
+
+    def test_time_until_next_event_children(self):
+        world = AnimationGroup()
+        effects = AnimationGroup(parent=world, time_scale=.5)
+        effects.add(Task(Mock(), interval=10))
+        self.assertEqual(world.time_until_next_event(), 20)
+
+    def test_visible(self):
+        visible = lambda target, props: False
+        a = Animation(self.mock, value=1, duration=2)
+        g = AnimationGroup(a, visible=visible)
+        self.assertIs(a.visible, visible)
+        g.update(1)
+        self.assertEqual(self.mock.value, 0)
+
+    def test_tier_receives_accumulated_time(self):
+        m = Mock()
+        a = Animation(self.mock, value=1, duration=4)
+        a.tier = 2
+        a.schedule(m, 'on update')
+        g = AnimationGroup(a)
+        g.update(1)
+        self.assertEqual(self.mock.value, .25)
+        g.update(1)
+        self.assertEqual(m.call_count, 1)
+        g.update(1)
+        self.assertEqual(self.mock.value, .75)
+
+    def test_tiers_are_spread_evenly(self):
+        mocks = [Mock() for i in range(4)]
+        g = AnimationGroup()
+        for m in mocks:
+            t = Task(m, interval=10, times=-1)
+            t.tier = 2
+            g.add(t)
+
+        for t in g.sprites():
+            t.update = Mock(wraps=t.update)
+        g.update(1)
+        self.assertEqual(sum(t.update.call_count for t in g.sprites()), 2)
+        g.update(1)
+        self.assertEqual(sum(t.update.call_count for t in g.sprites()), 4)
+
+    def test_tier_does_not_get_time_before_added(self):
+        g = AnimationGroup()
+        other = Task(Mock(), interval=10)
+        other.tier = 2
+        g.add(other)
+        g.update(1)
+        g.update(1)
+        g.update(1)
+
+        a = Animation(self.mock, value=1, duration=4)
+        a.tier = 2
+        g.add(a)
+        g.update(1)
+        self.assertEqual(self.mock.value, .25)
+        g.update(1)
+        g.update(1)
+        self.assertEqual(self.mock.value, .75)
+
+    def test_removed_tier_member(self):
+        m = Mock()
+        t = Task(m, interval=1)
+        t.tier = 2
+        g = AnimationGroup(t)
+        g.remove(t)
+        g.update(1)
+        g.update(1)
+        self.assertFalse(m.called)
+
+    def test_member_adds_new_tier(self):
+        g = AnimationGroup()
+        a = Animation(self.mock, value=1, duration=3)
+        a.tier = 3
+
+        def spawn():
+            g.add(a)
+
+        t = Task(spawn, interval=1)
+        t.tier = 2
+        g.add(t)
+        g.update(1)
+        self.assertIn(a, g)
+        g.update(1)
+        g.update(1)
+        g.update(1)
+        self.assertEqual(self.mock.value, 1)
+
+    def test_submitted_run_at_next_update(self):
+        g = AnimationGroup()
+        a = Animation(value=1, duration=2)
+        g.submit_start(a, self.mock)
+        self.assertNotIn(a, g)
+        self.assertEqual(self.mock.value, 0)
+
+        g.update(1)
+        self.assertIn(a, g)
+        self.assertEqual(self.mock.value, .5)
+
+        m = Mock()
+        g.submit_schedule(a, m)
+        g.submit_abort(a)
+        g.update(1)
+        self.assertNotIn(a, g)
+        self.assertTrue(m.called)
+        self.assertEqual(self.mock.value, .5)
+
+    def test_submitted_in_order_once(self):
+        g = AnimationGroup()
+        calls = list()
+
+        def resubmit(i):
+            calls.append(i)
+            g.submit(calls.append, 'next')
+
+        g.submit(resubmit, 1)
+        g.submit(calls.append, 2)
+        g.update(1)
+        self.assertEqual(calls, [1, 2])
+        g.update(1)
+        self.assertEqual(calls, [1, 2, 'next'])
+
+    def test_submit_from_many_threads(self):
+        g = AnimationGroup()
+        counts = [0] * 8
+
+        def count(i):
+            counts[i] += 1
+
+        def produce(i):
+            for j in range(500):
+                g.submit(count, i)
+                g.submit_start(Task(Mock()))
+
+        threads = [Thread(target=produce, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        g.update(0)
+        self.assertEqual(counts, [500] * 8)
+        self.assertEqual(len(g), 4000)
+
+    def test_tags(self):
+        a = Animation(self.mock, value=1, duration=2, tags='menu')
+        b = Animation(TestObject(), value=1, duration=2, tags=('menu', 'ui'))
+        t = Task(Mock(), 10, tags=['ui'])
+        g = AnimationGroup(a, b, t)
+        self.assertEqual(a.tags, frozenset(('menu',)))
+        self.assertEqual(set(g.tagged('menu')), {a, b})
+        self.assertEqual(set(g.tagged('ui')), {b, t})
+        self.assertEqual(g.tagged('spam'), [])
+
+        a.abort()
+        self.assertEqual(g.tagged('menu'), [b])
+
+    def test_abort_tagged(self):
+        m = Mock()
+        a = Animation(self.mock, value=1, duration=2, tags='menu')
+        t = Task(m, 10, tags='menu')
+        other = Task(Mock(), 10)
+        g = AnimationGroup(a, t, other)
+        self.assertEqual(set(g.abort_tagged('menu')), {a, t})
+        self.assertEqual(g.sprites(), [other])
+        self.assertEqual(self.mock.value, 0)
+        self.assertFalse(m.called)
+
+    def test_finish_tagged(self):
+        m = Mock()
+        a = Animation(self.mock, value=1, duration=2, tags='menu')
+        t = Task(m, 10, tags='menu')
+        g = AnimationGroup(a, t)
+        g.finish_tagged('menu')
+        self.assertEqual(len(g), 0)
+        self.assertEqual(self.mock.value, 1)
+        self.assertTrue(m.called)
+
+    def test_finish_tagged_without_values(self):
+        m = Mock()
+        a = Animation(self.mock, value=1, duration=2, tags='menu')
+        a.schedule(m)
+        g = AnimationGroup(a)
+        g.update(1)
+        g.finish_tagged('menu', apply_values=False)
+        self.assertEqual(len(g), 0)
+        self.assertEqual(self.mock.value, .5)
+        self.assertTrue(m.called)
+
+    def test_pause_tagged(self):
+        a = Animation(self.mock, value=1, duration=4, tags='menu')
+        g = AnimationGroup(a)
+        g.update(1)
+        g.pause_tagged('menu')
+        g.update(1)
+        self.assertEqual(self.mock.value, .25)
+        self.assertIsNone(g.time_until_next_event())
+
+        g.resume_tagged('menu')
+        g.update(1)
+        self.assertEqual(self.mock.value, .5)
+
+    def test_pause_tagged_tier(self):
+        a = Animation(self.mock, value=1, duration=8, tags='menu')
+        a.tier = 2
+        g = AnimationGroup(a)
+        g.update(1)
+        g.pause_tagged('menu')
+        g.update(1)
+        g.update(1)
+        g.resume_tagged('menu')
+        g.update(1)
+        g.update(1)
+        self.assertEqual(self.mock.value, .375)
+
+
+@skipUnless(hasattr(tracemalloc, 'reset_peak'), 'requires Python 3.9')
+class TestAllocations(TestCase):
+    """ Updating running members must allocate next to nothing
+
+    Everything allocated in an update adds to the work of the garbage
+    collector, so many animations would cause pauses.  The peak of one
+    update must stay below half a pointer per member, which rules out
+    copying the members or building objects that grow with them.
+    """
+
+    def peak_allocated(self, group, ticks=20):
+        tracemalloc.start()
+        try:
+            # the first ticks fill the free lists of the interpreter
+            for i in range(ticks):
+                group.update(1)
+            peak = 0
+            for i in range(ticks):
+                tracemalloc.reset_peak()
+                current = tracemalloc.get_traced_memory()[0]
+                group.update(1)
+                peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+        finally:
+            tracemalloc.stop()
+        return peak
+
+    def assertAllocatesLittle(self, group):
+        self.assertLess(self.peak_allocated(group), 4 * len(group))
+
+    def make_group(self, count=1000):
+        g = AnimationGroup()
+        for i in range(count):
+            g.add(Animation(TestObject(), value=1, duration=1e9))
+            g.add(Task(lambda: None, interval=3, times=-1))
+        return g
+
+    def test_no_callbacks(self):
+        self.assertAllocatesLittle(self.make_group())
+
+    def test_update_callbacks(self):
+        g = self.make_group()
+        for member in g.sprites():
+            if isinstance(member, Animation):
+                member.schedule(lambda: None, 'on update')
+        self.assertAllocatesLittle(g)
+
+    def test_rects(self):
+        g = AnimationGroup()
+        for i in range(1000):
+            rect = pygame.Rect(0, 0, 10, 10)
+            g.add(Animation(rect, x=1000000, y=-1000000, duration=1e9))
+        self.assertAllocatesLittle(g)
+
+    def test_tiers_and_deferred(self):
+        g = AnimationGroup(deferred=True)
+        for i in range(1000):
+            a = Animation(TestObject(), value=1, duration=1e9)
+            a.tier = 1 + i % 3
+            g.add(a)
+        self.assertAllocatesLittle(g)
@@ -0,0 +1,96 @@
+from unittest import TestCase
+
+from mock import Mock
+from pygame import Rect
+from pygame.sprite import Group
+
+from animation import Animation, InstancedAnimation, remove_animations_of
+
+from test_animation import TestObject
+
+
+class TestInstancedAnimation(TestCase):
+    def setUp(self):
+        self.objects = [TestObject(i * 10.) for i in range(4)]
+
+    def values(self):
+        return [i.value for i in self.objects]
+
+    def test_matches_animation(self):
+        others = [TestObject(i * 10.) for i in range(4)]
+        a = InstancedAnimation(*self.objects, value=100, duration=100,
+                               transition='in_out_quad')
+        b = Animation(*others, value=100, duration=100,
+                      transition='in_out_quad')
+        for i in range(5):
+            a.update(30)
+            b.update(30)
+            self.assertEqual(self.values(), [i.value for i in others])
+
+    def test_stagger(self):
+        a = InstancedAnimation(*self.objects, value=100, duration=100,
+                               stagger=50)
+        a.update(50)
+        self.assertEqual(self.values(), [50, 10, 20, 30])
+        a.update(50)
+        self.assertEqual(self.values(), [100, 55, 20, 30])
+        a.update(100)
+        self.assertEqual(self.values(), [100, 100, 100, 65])
+
+    def test_offsets(self):
+        a = InstancedAnimation(*self.objects, value=100, duration=100,
+                               offsets=[0, 50, 0, 50])
+        a.update(50)
+        self.assertEqual(self.values(), [50, 10, 60, 30])
+
+    def test_finishes_after_last_instance(self):
+        m = Mock()
+        a = InstancedAnimation(*self.objects, value=100, duration=100,
+                               stagger=10)
+        a.schedule(m)
+        g = Group(a)
+        a.update(100)
+        self.assertFalse(m.called)
+        self.assertIn(a, g)
+        a.update(30)
+        self.assertTrue(m.called)
+        self.assertNotIn(a, g)
+        self.assertEqual(self.values(), [100] * 4)
+
+    def test_finish(self):
+        a = InstancedAnimation(*self.objects, value=100, stagger=10)
+        a.finish()
+        self.assertEqual(self.values(), [100] * 4)
+
+    def test_relative_and_delay(self):
+        a = InstancedAnimation(*self.objects, value=5, duration=10,
+                               relative=True, delay=10)
+        a.update(12)
+        self.assertEqual(self.values(), [0, 10, 20, 30])
+        a.update(3)
+        self.assertEqual(self.values(), [2.5, 12.5, 22.5, 32.5])
+
+    def test_rects_are_rounded(self):
+        rects = [Rect(0, 0, 1, 1), Rect(1, 0, 1, 1)]
+        a = InstancedAnimation(*rects, x=10, duration=4)
+        a.update(1)
+        self.assertEqual([r.x for r in rects], [2, 3])
+
+    def test_callable_attribute(self):
+        a = InstancedAnimation(*self.objects, callable=10, duration=10)
+        a.update(5)
+        for i in self.objects:
+            i.callable.assert_called_with(5.)
+
+    def test_offsets_must_match_targets(self):
+        with self.assertRaises(ValueError):
+            InstancedAnimation(*self.objects, value=1, offsets=[1, 2])
+
+        with self.assertRaises(ValueError):
+            InstancedAnimation(*self.objects, value=1, offsets=[0, 0, 0, -1])
+
+    def test_remove_animations_of(self):
+        a = InstancedAnimation(*self.objects, value=100)
+        g = Group(a)
+        remove_animations_of(self.objects[2], g)
+        self.assertNotIn(a, g)
@@ -0,0 +1,97 @@
+from unittest import TestCase
+
+from mock import Mock
+from pygame.sprite import Group
+
+from animation import AnimatedProperty, LazyAnimation
+
+
+class Widget(object):
+    alpha = AnimatedProperty(255)
+    x = AnimatedProperty()
+
+    def __init__(self):
+        self.plain = 0
+
+
+class TestAnimatedProperty(TestCase):
+    def setUp(self):
+        self.widget = Widget()
+
+    def test_works_like_attribute(self):
+        self.assertEqual(self.widget.alpha, 255)
+        self.widget.alpha = 10
+        self.assertEqual(self.widget.alpha, 10)
+        self.assertEqual(Widget().alpha, 255)
+        self.assertIsInstance(Widget.alpha, AnimatedProperty)
+
+    def test_value_is_computed_when_read(self):
+        transition = Mock(side_effect=lambda p: p)
+        a = LazyAnimation(self.widget, alpha=55, duration=100,
+                          transition=transition)
+        transition.reset_mock()
+        for i in range(5):
+            a.update(10)
+        self.assertFalse(transition.called)
+        self.assertEqual(self.widget.alpha, 155)
+        self.assertEqual(transition.call_count, 1)
+
+    def test_finish_stores_final_values(self):
+        m = Mock()
+        a = LazyAnimation(self.widget, alpha=0, x=10, duration=100)
+        a.schedule(m)
+        g = Group(a)
+        a.update(100)
+        self.assertTrue(m.called)
+        self.assertNotIn(a, g)
+        self.assertEqual(self.widget.alpha, 0)
+        self.assertEqual(self.widget.x, 10)
+        self.assertNotIn('_animated_alpha_animation', self.widget.__dict__)
+
+    def test_update_callback(self):
+        values = list()
+        a = LazyAnimation(self.widget, x=100, duration=100)
+        a.schedule(lambda: values.append(self.widget.x), 'on update')
+        a.update(50)
+        a.update(0)
+        self.assertEqual(values, [50])
+
+    def test_abort_keeps_value(self):
+        m = Mock()
+        a = LazyAnimation(self.widget, x=100, duration=100)
+        a.schedule(m)
+        a.update(25)
+        a.abort()
+        a.update(25)
+        self.assertTrue(m.called)
+        self.assertEqual(self.widget.x, 25)
+
+    def test_set_takes_over(self):
+        a = LazyAnimation(self.widget, x=100, duration=100)
+        a.update(25)
+        self.widget.x = -1
+        a.update(100)
+        self.assertEqual(self.widget.x, -1)
+
+    def test_new_animation_takes_over(self):
+        a = LazyAnimation(self.widget, x=100, duration=100)
+        a.update(50)
+        b = LazyAnimation(self.widget, x=0, duration=100)
+        a.update(50)
+        self.assertEqual(self.widget.x, 50)
+        b.update(50)
+        self.assertEqual(self.widget.x, 25)
+
+    def test_delay_and_rounding(self):
+        a = LazyAnimation(self.widget, x=10, duration=4, delay=10,
+                          round_values=True)
+        a.update(10)
+        self.assertEqual(self.widget.x, 0)
+        a.update(1)
+        self.assertEqual(self.widget.x, 2)
+        a.update(1)
+        self.assertEqual(self.widget.x, 5)
+
+    def test_plain_attribute_raises_valueerror(self):
+        with self.assertRaises(ValueError):
+            LazyAnimation(self.widget, plain=10)
@@ -0,0 +1,89 @@
+from unittest import TestCase, skipIf
+
+from animation import Animation, AnimationTransition, FixedAnimation
+from animation.backend import speedups
+from animation.bake import _curve_value
+from animation.transitions import get_transition, python_transitions
+
+from test_animation import TestObject
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@skipIf(speedups is None, 'speedups are not built or not used')
+class TestSpeedups(TestCase):
+    def test_transitions_match_python(self):
+        for name, function in python_transitions.items():
+            compiled = get_transition(name)
+            self.assertIsNot(compiled, function)
+            self.assertIs(getattr(AnimationTransition, name), function)
+            for i in range(1001):
+                p = i / 1000.
+                self.assertEqual(compiled(p), function(p), (name, p))
+
+    def test_animation_step_matches_python(self):
+        for round_values in (False, True):
+            objects = TestObject(), TestObject()
+            a0 = Animation(objects[0], value=7.3, duration=3.,
+                           transition='in_out_back', round_values=round_values)
+            a1 = Animation(objects[1], value=7.3, duration=3.,
+                           transition='in_out_back', round_values=round_values)
+            a1._step = None
+            for i in range(40):
+                a0.update(.1)
+                a1.update(.1)
+                self.assertEqual(objects[0].value, objects[1].value)
+                self.assertIs(type(objects[0].value), type(objects[1].value))
+
+    def test_fixed_step_matches_python(self):
+        for transition in ('in_out_back', 'out_elastic', 'linear'):
+            objects = TestObject(), TestObject()
+            objects[0].value = objects[1].value = 50
+            a0 = FixedAnimation(objects[0], value=-731, duration=97,
+                                transition=transition)
+            a1 = FixedAnimation(objects[1], value=-731, duration=97,
+                                transition=transition)
+            self.assertIsNotNone(a0._step)
+            a1._step = None
+            for i in range(40):
+                a0.update(3)
+                a1.update(3)
+                self.assertEqual(objects[0].value, objects[1].value)
+                self.assertIs(type(objects[0].value), type(objects[1].value))
+
+    def test_fixed_big_values_use_python(self):
+        target = TestObject()
+        target.value = 0
+        a = FixedAnimation(target, value=1 << 70, duration=10)
+        self.assertIsNone(a._step)
+        a.update(5)
+        self.assertEqual(target.value, 1 << 69)
+
+    def test_custom_set_value_uses_python(self):
+        class Custom(Animation):
+            def _set_value(self, target, name, value):
+                setattr(target, name, -value)
+
+        target = TestObject()
+        a = Custom(target, value=1, duration=1)
+        self.assertIsNone(a._step)
+        a.update(1)
+        self.assertEqual(target.value, -1)
+
+    def test_curve_value_matches_python(self):
+        function = AnimationTransition.out_bounce
+        samples = tuple(function(i / 7.) for i in range(8))
+        for interpolate in (False, True):
+            args = samples, 7.5, function(1.), function, interpolate
+            for i in range(-10, 1011):
+                p = i / 1000.
+                self.assertEqual(speedups.curve_value(*(args + (p,))),
+                                 _curve_value(*(args + (p,))), p)
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_animation_transition_takes_arrays(self):
+        values = AnimationTransition.in_quad(numpy.array([0., .5, 1.]))
+        self.assertEqual(values.tolist(), [0., .25, 1.])
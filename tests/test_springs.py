@@ -0,0 +1,144 @@
+from unittest import TestCase, skipIf
+
+from mock import Mock
+from pygame import Rect
+
+from animation import AnimationGroup, Springs
+from animation import springs as springs_module
+
+from test_animation import TestObject
+
+
+class TestSprings(TestCase):
+    def setUp(self):
+        self.mock = TestObject()
+        self.springs = Springs(capacity=2)
+        self.group = AnimationGroup(self.springs)
+
+    def run_until_settled(self, limit=1000):
+        for i in range(limit):
+            if not self.springs:
+                return i
+            self.group.update(16)
+        self.fail('springs did not settle')
+
+    def test_moves_to_goal_and_settles(self):
+        m = Mock()
+        spring = self.springs.add(self.mock, 'value', 100)
+        spring.schedule(m)
+        self.group.update(16)
+        self.assertGreater(self.mock.value, 0)
+        self.assertLess(self.mock.value, 100)
+        self.run_until_settled()
+        self.assertEqual(self.mock.value, 100)
+        self.assertTrue(m.called)
+        self.assertIsNone(spring.index)
+        self.assertEqual(len(self.springs), 0)
+
+    def test_underdamped_overshoots(self):
+        self.springs.add(self.mock, 'value', 100, stiffness=200, damping=5)
+        highest = 0
+        for i in range(100):
+            self.group.update(16)
+            highest = max(highest, self.mock.value)
+        self.assertGreater(highest, 100)
+
+    def test_stable_with_big_steps(self):
+        self.springs.add(self.mock, 'value', 100, stiffness=10000, damping=1)
+        self.springs.max_step = 10.
+        for i in range(100):
+            self.group.update(1000)
+        self.assertLess(abs(self.mock.value - 100), 100)
+
+    def test_retarget_keeps_velocity(self):
+        spring = self.springs.add(self.mock, 'value', 100)
+        self.group.update(16)
+        position = self.springs.position
+        velocity = spring.velocity
+        spring.retarget(-100)
+        self.assertIs(self.springs.position, position)
+        self.assertEqual(spring.velocity, velocity)
+        self.assertEqual(spring.goal, -100)
+        self.run_until_settled()
+        self.assertEqual(self.mock.value, -100)
+
+    def test_retarget_finished_spring(self):
+        spring = self.springs.add(self.mock, 'value', 100)
+        self.run_until_settled()
+        spring.retarget(0)
+        self.assertEqual(len(self.springs), 1)
+        self.assertEqual(spring.position, 100)
+        self.run_until_settled()
+        self.assertEqual(self.mock.value, 0)
+
+    def test_slots_are_reused_and_grow(self):
+        others = [TestObject() for i in range(5)]
+        for i, other in enumerate(others):
+            self.springs.add(other, 'value', i * 10)
+        self.assertEqual(len(self.springs), 5)
+        self.run_until_settled()
+        self.assertEqual([i.value for i in others], [0, 10, 20, 30, 40])
+        size = len(self.springs.position)
+        spring = self.springs.add(self.mock, 'value', 1)
+        self.assertLess(spring.index, 5)
+        self.assertEqual(len(self.springs.position), size)
+
+    def test_finish_and_abort(self):
+        a = self.springs.add(self.mock, 'value', 100)
+        other = TestObject()
+        b = self.springs.add(other, 'value', 100)
+        self.group.update(16)
+        a.finish()
+        self.assertEqual(self.mock.value, 100)
+        value = other.value
+        b.abort()
+        self.group.update(16)
+        self.assertEqual(other.value, value)
+        self.assertEqual(len(self.springs), 0)
+
+    def test_without_target(self):
+        spring = self.springs.add(None, None, 10, value=0)
+        self.group.update(16)
+        self.assertGreater(spring.position, 0)
+        self.assertEqual(spring.position, self.springs.position[spring.index])
+
+    def test_rect_values_are_rounded(self):
+        rect = Rect(0, 0, 10, 10)
+        self.springs.add(rect, 'x', 100)
+        self.group.update(16)
+        self.assertIsInstance(rect.x, int)
+
+    def test_invalid_values_raise_valueerror(self):
+        with self.assertRaises(ValueError):
+            self.springs.add(self.mock, 'value', 'spam')
+
+        with self.assertRaises(ValueError):
+            self.springs.add(self.mock, 'value', 1, mass=0)
+
+    @skipIf(springs_module.numpy is None, 'numpy is not installed')
+    def test_same_result_without_numpy(self):
+        other = TestObject()
+        self.springs.add(self.mock, 'value', 100, damping=10)
+        for i in range(20):
+            self.group.update(16)
+
+        numpy = springs_module.numpy
+        springs_module.numpy = None
+        try:
+            springs = Springs()
+            springs.add(other, 'value', 100, damping=10)
+            for i in range(20):
+                springs.update(16)
+        finally:
+            springs_module.numpy = numpy
+        self.assertAlmostEqual(self.mock.value, other.value)
+
+    def test_array_without_numpy(self):
+        numpy = springs_module.numpy
+        springs_module.numpy = None
+        try:
+            values = springs_module._make_array(4)
+        finally:
+            springs_module.numpy = numpy
+        self.assertEqual(values.typecode, 'd')
+        self.assertEqual(list(values), [0.] * 4)
@@ -0,0 +1,114 @@
+import json
+from io import StringIO
+from itertools import count
+from unittest import TestCase
+
+from mock import Mock
+
+from animation import Animation, AnimationGroup, CallbackBudget, Task, \
+    TraceRecorder
+
+from test_animation import TestObject
+
+
+class TestTraceRecorder(TestCase):
+    def setUp(self):
+        self.mock = TestObject()
+        ticks = count()
+        self.recorder = TraceRecorder(capacity=100,
+                                      clock=lambda: next(ticks) / 1000.)
+
+    def tearDown(self):
+        self.recorder.disable()
+
+    def names(self):
+        return [i['name'] for i in self.recorder.events()]
+
+    def test_disabled_does_not_hook(self):
+        update = Animation.__dict__['update']
+        self.recorder.enable()
+        self.assertIsNot(Animation.__dict__['update'], update)
+        self.recorder.disable()
+        self.assertIs(Animation.__dict__['update'], update)
+        self.assertFalse(self.recorder.enabled)
+
+        Animation(self.mock, value=1, duration=1).update(1)
+        self.assertEqual(len(self.recorder), 0)
+
+    def test_records_lifecycle(self):
+        with self.recorder:
+            a = Animation(value=1, duration=1)
+            a.schedule(Mock())
+            a.start(self.mock)
+            t = Task(Mock(), 1)
+            g = AnimationGroup(a, t)
+            g.update(1)
+        names = self.names()
+        for name in ('Animation.start', 'Animation.update', 'Animation.finish',
+                     'Animation.abort', 'Animation on finish', 'Task.update',
+                     'Task.finish', 'Task on interval', 'AnimationGroup.update'):
+            self.assertIn(name, names)
+        # no callbacks were scheduled
+        self.assertNotIn('Animation on update', names)
+
+    def slow_callback_recorder(self):
+        now = [0.]
+
+        def slow():
+            now[0] += 10.
+
+        self.recorder = TraceRecorder(clock=lambda: now[0])
+        return slow
+
+    def test_deferred_callback_time(self):
+        slow = self.slow_callback_recorder()
+        with self.recorder:
+            a = Animation(self.mock, value=1, duration=1)
+            a.schedule(slow)
+            g = AnimationGroup(a, deferred=True)
+            g.update(1)
+        events = [i for i in self.recorder.events()
+                  if i['name'] == 'Animation on finish']
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['dur'], 10e6)
+
+    def test_budget_callbacks(self):
+        slow = self.slow_callback_recorder()
+        with self.recorder:
+            a = Animation(self.mock, value=1, duration=1)
+            a.schedule(slow)
+            g = AnimationGroup(a, budget=CallbackBudget(max_count=1))
+            g.update(1)
+        events = [i for i in self.recorder.events()
+                  if i['name'] == 'CallbackBudget slow']
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['dur'], 10e6)
+
+    def test_ring_buffer(self):
+        with self.recorder:
+            a = Animation(self.mock, value=1, duration=1000)
+            for i in range(150):
+                a.update(1)
+        self.assertEqual(len(self.recorder), 100)
+        self.assertEqual(self.recorder.dropped, 51)
+
+    def test_only_one_recorder(self):
+        with self.recorder:
+            with self.assertRaises(RuntimeError):
+                TraceRecorder().enable()
+
+    def test_export(self):
+        with self.recorder:
+            with self.recorder.span('physics'):
+                Animation(self.mock, value=1, duration=2).update(1)
+        fp = StringIO()
+        self.recorder.export(fp)
+        data = json.loads(fp.getvalue())
+        events = data['traceEvents']
+        self.assertEqual([i['name'] for i in events],
+                         ['Animation.start', 'Animation.update', 'physics'])
+        span = events[-1]
+        self.assertEqual(span['ph'], 'X')
+        self.assertEqual(span['cat'], 'user')
+        self.assertEqual(span['ts'], 0)
+        self.assertEqual(span['dur'], 5000)
@@ -0,0 +1,95 @@
+from itertools import count
+from unittest import TestCase
+
+from mock import Mock
+from pygame import Rect
+from pygame.sprite import Group
+
+from animation import AnimationGroup, StreamTrack
+
+from test_animation import TestObject
+
+
+class TestStreamTrack(TestCase):
+    def setUp(self):
+        self.mock = TestObject()
+
+    def test_interpolates_between_samples(self):
+        samples = [(0, {'value': 0}), (2, {'value': 10}), (4, {'value': 0})]
+        track = StreamTrack(samples, self.mock)
+        track.update(1)
+        self.assertEqual(self.mock.value, 5)
+        track.update(2)
+        self.assertEqual(self.mock.value, 5)
+
+    def test_reads_samples_lazily(self):
+        read = list()
+
+        def samples():
+            for i in range(1000000):
+                read.append(i)
+                yield i, i * 2
+
+        track = StreamTrack(samples(), self.mock, name='value')
+        track.update(2.5)
+        self.assertEqual(self.mock.value, 5)
+        self.assertEqual(len(read), 4)
+
+    def test_finishes_after_last_sample(self):
+        m = Mock()
+        track = StreamTrack([(0, 0), (1, 1)], self.mock, name='value')
+        track.schedule(m)
+        g = Group(track)
+        track.update(2)
+        self.assertEqual(self.mock.value, 1)
+        self.assertTrue(m.called)
+        self.assertNotIn(track, g)
+
+    def test_finish_jumps_to_next_sample(self):
+        track = StreamTrack(((i, i) for i in range(10)), self.mock,
+                            name='value')
+        track.update(2.5)
+        track.finish()
+        self.assertEqual(self.mock.value, 3)
+
+    def test_finish_endless_stream(self):
+        m = Mock()
+        track = StreamTrack(((t, t * 2) for t in count()), self.mock,
+                            name='value')
+        track.schedule(m)
+        track.update(1.5)
+        track.finish()
+        self.assertEqual(self.mock.value, 4)
+        self.assertTrue(m.called)
+
+    def test_finish_tagged_endless_stream(self):
+        track = StreamTrack(((t, t) for t in count()), self.mock,
+                            name='value', tags='replay')
+        g = AnimationGroup(track)
+        g.finish_tagged('replay')
+        self.assertEqual(self.mock.value, 1)
+        self.assertNotIn(track, g)
+
+    def test_callable_and_transition(self):
+        track = StreamTrack([(0, 0), (2, 1)], self.mock, name='callable',
+                            transition='in_quad')
+        track.update(1)
+        self.assertEqual(self.mock.callable.call_args[0], (.25,))
+
+    def test_rect_values_are_rounded(self):
+        rect = Rect(0, 0, 10, 10)
+        track = StreamTrack([(0, 0), (3, 10)], rect, name='x')
+        track.update(1)
+        self.assertEqual(rect.x, 3)
+
+    def test_invalid_samples_raise_valueerror(self):
+        with self.assertRaises(ValueError):
+            StreamTrack([], self.mock, name='value')
+
+        with self.assertRaises(ValueError):
+            StreamTrack([(0, 'spam')], self.mock, name='value')
+
+        track = StreamTrack([(1, 0), (2, 1), (0, 1)], self.mock,
+                            name='value')
+        with self.assertRaises(ValueError):
+            track.update(3)
@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+from animation import Animation, AnimationTransition, register_transition
+from animation.transitions import get_transition, transition_info
+
+from test_animation import TestObject
+
+
+def smoothstep(progress):
+    return progress * progress * (3. - 2. * progress)
+
+
+class TestTransitionRegistry(TestCase):
+    def test_builtins_registered(self):
+        info = transition_info('in_quad')
+        self.assertIs(transition_info(AnimationTransition.in_quad), info)
+        self.assertIs(transition_info(info.function), info)
+        self.assertTrue(info.monotonic)
+        self.assertEqual(info.cost, 'low')
+        self.assertFalse(transition_info('out_bounce').monotonic)
+
+    def test_get_transition(self):
+        self.assertIs(get_transition('linear'),
+                      transition_info('linear').function)
+        self.assertEqual(get_transition('linear')(.25), .25)
+        self.assertIs(get_transition(smoothstep), smoothstep)
+
+    def test_unknown_name_raises_attributeerror(self):
+        with self.assertRaises(AttributeError):
+            get_transition('spam')
+
+    def test_register_transition(self):
+        register_transition('smoothstep', smoothstep, monotonic=True,
+                            cost='low')
+        info = transition_info(smoothstep)
+        self.assertEqual(info.name, 'smoothstep')
+        self.assertTrue(info.monotonic)
+
+        target = TestObject()
+        a = Animation(target, value=1, duration=4, transition='smoothstep')
+        a.update(1)
+        self.assertEqual(target.value, smoothstep(.25))
+
+    def test_register_invalid_raises_valueerror(self):
+        with self.assertRaises(ValueError):
+            register_transition('spam', None)
+
+        with self.assertRaises(ValueError):
+            register_transition('spam', smoothstep, cost='free')